@@ -1,22 +1,67 @@
 import re
+import sys
 
 class InvalidArticleError(Exception):
     """Excepción de validación, ahora usada en ParserHtml."""
     pass
 
+def make_snippet(texto: str, length: int = 300) -> str:
+    return (texto[:length] + "…") if len(texto) > length else texto
+
+def make_slug(titulo: str) -> str:
+    s = titulo.lower()
+    return re.sub(r"[^a-z0-9]+", "-", s).strip('-')
+
 class Articulo:
     """
     Representa un artículo con título, autor y texto.
+    `fecha` (datetime) es opcional; se usa para builds reproducibles.
     """
-    def __init__(self, titulo: str, autor: str, texto: str):
+    __slots__ = ("titulo", "autor", "texto", "fecha")
+
+    def __init__(self, titulo: str, autor: str, texto: str, fecha=None):
         # Sólo limpiamos, no validamos longitud
         self.titulo = titulo.strip()
         self.autor  = autor.strip()
         self.texto  = texto.strip()
+        self.fecha  = fecha
 
     def snippet(self, length: int = 300) -> str:
-        return (self.texto[:length] + "…") if len(self.texto) > length else self.texto
+        return make_snippet(self.texto, length)
 
     def slug(self) -> str:
-        s = self.titulo.lower()
-        return re.sub(r"[^a-z0-9]+", "-", s).strip('-')
+        return make_slug(self.titulo)
+
+class ArticleStore:
+    """
+    Artículos guardados en columnas paralelas (títulos, autores internados,
+    textos y fechas) en lugar de un objeto por artículo. Indexar devuelve un
+    Articulo creado en ese momento, así que no hay que comparar por identidad.
+    """
+    __slots__ = ("titulos", "autores", "textos", "fechas")
+
+    def __init__(self, filas=()):
+        self.titulos = []
+        self.autores = []
+        self.textos = []
+        self.fechas = []
+        for fila in filas:
+            self.append(*fila)
+
+    def append(self, titulo, autor, texto, fecha=None):
+        self.titulos.append(titulo)
+        self.autores.append(sys.intern(autor))
+        self.textos.append(texto)
+        self.fechas.append(fecha)
+
+    def __len__(self):
+        return len(self.titulos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return Articulo(self.titulos[i], self.autores[i], self.textos[i], self.fechas[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,10 @@
+"""
+Benchmarks de ParserHtml sobre un corpus sintético.
+
+    python -m benchmarks medir --tamanos 1000 10000 --salida baseline.json
+    python -m benchmarks comparar baseline.json actual.json --umbral 0.25
+
+`comparar` termina con código 1 si alguna métrica empeoró más que el umbral.
+"""
+from .corpus import Corpus, generar_articulos
+from .mediciones import comparar, medir
@@ -0,0 +1,38 @@
+import argparse
+import sys
+from . import mediciones as bench
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    medir = comandos.add_parser("medir", help="mide las etapas y guarda el resultado en JSON")
+    medir.add_argument("--tamanos", type=int, nargs="+", default=list(bench.TAMANOS))
+    medir.add_argument("--repeticiones", type=int, default=1)
+    medir.add_argument("--semilla", type=int, default=0)
+    medir.add_argument("--salida", default="baseline.json")
+
+    comparar = comandos.add_parser("comparar", help="compara un resultado contra la línea de base")
+    comparar.add_argument("base")
+    comparar.add_argument("actual")
+    comparar.add_argument("--umbral", type=float, default=bench.UMBRAL)
+
+    args = parser.parse_args(argv)
+    if args.comando == "medir":
+        resultado = bench.medir(args.tamanos, args.repeticiones, args.semilla)
+        bench.guardar(resultado, args.salida)
+        bench.imprimir(resultado)
+        print(f"Resultado guardado en {args.salida}")
+        return 0
+
+    regresiones = bench.comparar(bench.cargar(args.base), bench.cargar(args.actual), args.umbral)
+    for n, nombre, anterior, actual in regresiones:
+        print(f"Regresión: {nombre} con {n} artículos: {anterior:.3f}s -> {actual:.3f}s "
+              f"(+{(actual / anterior - 1) * 100:.0f}%)")
+    if regresiones:
+        return 1
+    print("Sin regresiones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
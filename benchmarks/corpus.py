@@ -0,0 +1,97 @@
+import random
+from articulo import Articulo
+
+# Palabras funcionales del español, las más frecuentes de cualquier texto
+COMUNES = [
+    "de", "la", "que", "el", "en", "y", "a", "los", "del", "se", "las", "por",
+    "un", "para", "con", "no", "una", "su", "al", "lo", "como", "más", "pero",
+    "sus", "le", "ya", "o", "este", "sí", "porque", "esta", "entre", "cuando",
+    "muy", "sin", "sobre", "también", "me", "hasta", "hay", "donde", "quien",
+    "desde", "todo", "nos", "durante", "todos", "uno", "les", "ni", "contra",
+]
+
+SILABAS = [
+    "ca", "de", "la", "ma", "na", "pa", "ra", "sa", "ta", "ba", "co", "do", "lo",
+    "mo", "no", "po", "ro", "so", "to", "ci", "di", "li", "mi", "ni", "pi", "ri",
+    "si", "ti", "cu", "du", "lu", "mu", "nu", "pu", "ru", "tu", "ción", "mien",
+    "tra", "pre", "pro", "con", "des", "gue", "que", "ble", "gra", "cia", "dad",
+    "ñe", "llo", "rre", "ven", "tor", "mar", "sal", "fue", "go", "ja", "vo",
+]
+
+NOMBRES = [
+    "María", "José", "Ana", "Juan", "Lucía", "Carlos", "Sofía", "Luis", "Paula",
+    "Jorge", "Laura", "Diego", "Valeria", "Martín", "Camila", "Pablo", "Julieta",
+    "Federico", "Florencia", "Lautaro", "Rosangel", "Marcelo", "Agustina", "Tomás",
+]
+
+APELLIDOS = [
+    "Pérez", "González", "Rodríguez", "Fernández", "López", "Martínez", "García",
+    "Gómez", "Díaz", "Sánchez", "Romero", "Sosa", "Álvarez", "Torres", "Ruiz",
+    "Ramírez", "Flores", "Acosta", "Benítez", "Medina", "Herrera", "Suárez",
+    "Aguirre", "Giménez", "Gutiérrez", "Pereyra", "Rojas", "Molina", "Castro",
+    "Ortiz", "Silva", "Núñez", "Luna", "Juárez", "Cabrera", "Ríos", "Ferreyra",
+    "Godoy", "Morales", "Domínguez", "Moreno", "Peralta", "Vega", "Carrizo",
+    "Quiroga", "Ponce", "Vera", "Grinspan", "Salazar", "Zárate",
+]
+
+VOCABULARIO = 20000
+AUTORES = 2000
+
+class Corpus:
+    """
+    Generador determinista de artículos sintéticos: texto con frecuencias de
+    palabras tipo Zipf (palabras funcionales reales más un vocabulario armado
+    con sílabas) y autores con distribución de cola larga, unos pocos muy
+    prolíficos y muchos con un par de notas. Con la misma semilla produce
+    siempre los mismos artículos, y los primeros n no dependen del total.
+    """
+    def __init__(self, semilla=0, vocabulario=VOCABULARIO, autores=AUTORES):
+        rng = random.Random(semilla)
+        palabras = list(COMUNES)
+        vistas = set(palabras)
+        while len(palabras) < vocabulario:
+            palabra = "".join(rng.choice(SILABAS) for _ in range(rng.choice((2, 2, 3, 3, 3, 4))))
+            if palabra not in vistas:
+                vistas.add(palabra)
+                palabras.append(palabra)
+        self.palabras = palabras
+        self._pesos_palabras = _zipf(len(palabras), 1.07)
+
+        nombres = []
+        for _ in range(autores):
+            nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}"
+            # Como en los feeds reales: mayúsculas y espacios irregulares
+            if rng.random() < 0.2:
+                nombre = f"  {nombre.lower()} "
+            nombres.append(nombre)
+        self.autores = nombres
+        self._pesos_autores = _zipf(len(nombres), 1.0)
+        self.semilla = semilla
+
+    def _palabras(self, rng, k):
+        return rng.choices(self.palabras, cum_weights=self._pesos_palabras, k=k)
+
+    def articulos(self, n):
+        """Genera `n` Articulo."""
+        rng = random.Random(self.semilla + 1)
+        for i in range(n):
+            titulo = " ".join(self._palabras(rng, rng.randint(5, 12))).capitalize()
+            autor = rng.choices(self.autores, cum_weights=self._pesos_autores)[0]
+            largos = [rng.randint(8, 25) for _ in range(rng.randint(3, 12))]
+            palabras = self._palabras(rng, sum(largos))
+            oraciones, inicio = [], 0
+            for largo in largos:
+                oraciones.append(" ".join(palabras[inicio:inicio + largo]).capitalize() + ".")
+                inicio += largo
+            yield Articulo(f"{titulo} {i}", autor, " ".join(oraciones))
+
+def _zipf(n, s):
+    """Pesos acumulados de una distribución de Zipf con exponente s."""
+    acumulado, pesos = 0.0, []
+    for rango in range(1, n + 1):
+        acumulado += 1 / rango ** s
+        pesos.append(acumulado)
+    return pesos
+
+def generar_articulos(n, semilla=0):
+    return Corpus(semilla).articulos(n)
@@ -0,0 +1,117 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from .corpus import Corpus
+
+TAMANOS = (1_000, 10_000, 100_000, 1_000_000)
+
+# Aumento relativo tolerado antes de considerar que una métrica empeoró
+UMBRAL = 0.25
+
+# Las mediciones por debajo de este tiempo son ruido: no se comparan
+MINIMO = 0.05
+
+def _cronometrar(funcion, repeticiones):
+    """Mejor tiempo (segundos) de `repeticiones` ejecuciones y el último resultado."""
+    mejor, resultado = None, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, resultado
+
+def medir_tamano(n, repeticiones=1, semilla=0):
+    """
+    Tiempos (segundos) de cada etapa de ParserHtml con `n` artículos:
+    normalizar (_filter_and_normalize), tarjetas (_iter_cards de todo el
+    corpus), resumen (_build_summary), articulos (el bucle de páginas de
+    generate_html) y zip (crear_zip.crear_zip_proyecto sobre la salida).
+    """
+    from crear_zip import crear_zip_proyecto
+    from parser_html import ParserHtml
+
+    articulos = list(Corpus(semilla).articulos(n))
+    carpeta = tempfile.mkdtemp(prefix="bench_")
+    salida = os.path.join(carpeta, "output")
+    metricas = {}
+    try:
+        parser = ParserHtml((), output_dir=salida)
+        metricas["normalizar"], normalizados = _cronometrar(
+            lambda: parser._filter_and_normalize(articulos), repeticiones)
+        del articulos
+
+        parser = ParserHtml(normalizados, output_dir=salida, columnar=True)
+        del normalizados
+        posiciones = range(len(parser.store))
+        metricas["tarjetas"], _ = _cronometrar(
+            lambda: sum(len(t) for t in parser._iter_cards(posiciones)), repeticiones)
+        metricas["resumen"], _ = _cronometrar(parser._build_summary, repeticiones)
+
+        # Estado que _generate prepara antes de escribir los artículos
+        parser._publicar_recursos()
+        parser._previas, parser._manifest, parser._escritos = {}, {}, []
+        parser._relacionados = None
+        metricas["articulos"], _ = _cronometrar(
+            lambda: parser._write_articles(list(posiciones), "01/01/1970 00:00:00", 1), repeticiones)
+
+        # crear_zip_proyecto trabaja sobre el directorio actual
+        anterior = os.getcwd()
+        os.chdir(carpeta)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                metricas["zip"], _ = _cronometrar(crear_zip_proyecto, repeticiones)
+        finally:
+            os.chdir(anterior)
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    return metricas
+
+def medir(tamanos=TAMANOS, repeticiones=1, semilla=0):
+    """Resultado completo (JSON serializable) para todos los `tamanos`."""
+    resultado = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "tamanos": {},
+    }
+    for n in tamanos:
+        resultado["tamanos"][str(n)] = medir_tamano(n, repeticiones, semilla)
+    return resultado
+
+def comparar(base, actual, umbral=UMBRAL, minimo=MINIMO):
+    """
+    Lista de (tamaño, métrica, base, actual) de las métricas de `actual` que
+    tardan más de (1 + umbral) veces lo registrado en `base`. Sólo compara
+    los tamaños y métricas presentes en ambos.
+    """
+    regresiones = []
+    for n, metricas in actual["tamanos"].items():
+        previas = base["tamanos"].get(n, {})
+        for nombre, segundos in metricas.items():
+            anterior = previas.get(nombre)
+            if anterior is None or max(anterior, segundos) < minimo:
+                continue
+            if segundos > anterior * (1 + umbral):
+                regresiones.append((n, nombre, anterior, segundos))
+    return regresiones
+
+def cargar(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def guardar(resultado, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+def imprimir(resultado, archivo=sys.stdout):
+    for n, metricas in resultado["tamanos"].items():
+        detalle = "  ".join(f"{nombre}={segundos:.3f}s" for nombre, segundos in metricas.items())
+        print(f"{int(n):>9} artículos: {detalle}", file=archivo)
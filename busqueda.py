@@ -0,0 +1,207 @@
+import hashlib
+import json
+
+# Cantidad máxima de posiciones por archivo. Un prefijo que la supera se parte
+# en prefijos más largos; un token que por sí solo la supera (p. ej. "de" o
+# "la", que aparecen en casi todos los artículos) va a varios archivos por
+# rango de posiciones, así que ningún archivo crece con el corpus.
+MAX_POSTINGS = 20000
+
+# Artículos (slug, título) por archivo docs-N.json
+DOCS_POR_ARCHIVO = 1000
+
+CARPETA = "busqueda"
+
+# Cliente de búsqueda: tokeniza igual que indice_invertido.tokenizar, pide sólo
+# los shards de los tokens de la consulta e intersecta sus posiciones. De los
+# tokens partidos en varios archivos pide sólo las partes cuyo rango incluye
+# algún candidato; si todos los tokens están partidos, recorre las partes del
+# primero hasta juntar MAX_RESULTADOS.
+SCRIPT = """(function () {
+  const base = 'busqueda/';
+  const MAX_RESULTADOS = 50;
+  const cache = {};
+  let manifest = null;
+
+  function cargar(nombre) {
+    if (!cache[nombre]) cache[nombre] = fetch(base + nombre).then(r => r.json());
+    return cache[nombre];
+  }
+
+  function tokenizar(texto) {
+    return texto.toLowerCase().normalize('NFKD').replace(/[\\u0300-\\u036f]/g, '')
+      .match(/[\\p{L}\\p{N}_]+/gu) || [];
+  }
+
+  function shardDe(token) {
+    for (let n = token.length; n >= 0; n--) {
+      const shard = manifest.shards[token.slice(0, n)];
+      if (shard !== undefined) return shard;
+    }
+    return null;
+  }
+
+  function decodificar(saltos) {
+    let id = 0;
+    return (saltos || []).map(salto => (id += salto));
+  }
+
+  function interseccion(a, b) {
+    const conjunto = new Set(b);
+    return a.filter(id => conjunto.has(id));
+  }
+
+  async function posiciones(token) {
+    const shard = shardDe(token);
+    if (shard === null) return [];
+    const datos = await cargar('s' + shard + '.json');
+    return decodificar(datos[token]);
+  }
+
+  async function parte(token, k) {
+    const datos = await cargar('s' + manifest.partes[token][0] + '-' + k + '.json');
+    return decodificar(datos[token]);
+  }
+
+  // Posiciones de un token partido, sólo de las partes que pueden tener algún candidato
+  async function posicionesEn(token, candidatos) {
+    const inicios = manifest.partes[token][1];
+    const pedidas = [];
+    for (let k = 0, c = 0; k < inicios.length && c < candidatos.length; k++) {
+      const fin = k + 1 < inicios.length ? inicios[k + 1] : Infinity;
+      while (c < candidatos.length && candidatos[c] < inicios[k]) c++;
+      if (c < candidatos.length && candidatos[c] < fin) pedidas.push(k);
+    }
+    const listas = await Promise.all(pedidas.map(k => parte(token, k)));
+    return [].concat(...listas);
+  }
+
+  async function buscar(consulta) {
+    manifest = manifest || await cargar('manifest.json');
+    const tokens = tokenizar(consulta);
+    if (!tokens.length) return [];
+    const partidos = tokens.filter(t => manifest.partes[t]);
+    const enteros = tokens.filter(t => !manifest.partes[t]);
+    let ids = [];
+    if (enteros.length) {
+      const listas = await Promise.all(enteros.map(posiciones));
+      ids = listas.reduce(interseccion);
+      for (const token of partidos) ids = interseccion(ids, await posicionesEn(token, ids));
+    } else {
+      const partes = manifest.partes[partidos[0]][1].length;
+      for (let k = 0; k < partes && ids.length < MAX_RESULTADOS; k++) {
+        let encontrados = await parte(partidos[0], k);
+        for (const token of partidos.slice(1)) {
+          encontrados = interseccion(encontrados, await posicionesEn(token, encontrados));
+        }
+        ids = ids.concat(encontrados);
+      }
+    }
+    const porArchivo = manifest.docs_por_archivo;
+    return Promise.all(ids.slice(0, MAX_RESULTADOS).map(async id => {
+      const docs = await cargar('docs-' + Math.floor(id / porArchivo) + '.json');
+      return docs[id % porArchivo];
+    }));
+  }
+
+  document.getElementById('buscar').addEventListener('submit', async evento => {
+    evento.preventDefault();
+    const resultados = document.getElementById('resultados');
+    const encontrados = await buscar(document.getElementById('q').value);
+    resultados.replaceChildren();
+    if (!encontrados.length) {
+      resultados.textContent = 'No se encontraron artículos';
+      return;
+    }
+    const lista = document.createElement('ul');
+    for (const [slug, titulo] of encontrados) {
+      const item = document.createElement('li');
+      const enlace = document.createElement('a');
+      enlace.href = slug + '.html';
+      enlace.textContent = titulo;
+      item.appendChild(enlace);
+      lista.appendChild(item);
+    }
+    resultados.appendChild(lista);
+  });
+})();
+"""
+SCRIPT_NAME = f"buscar.{hashlib.sha1(SCRIPT.encode('utf-8')).hexdigest()[:10]}.js"
+
+CONTENIDO = f"""<form id='buscar' class='mb-4' role='search'>
+  <input type='search' id='q' class='form-control' placeholder='Buscar artículos...' autofocus>
+</form>
+<div id='resultados'></div>
+<script src='{SCRIPT_NAME}'></script>"""
+
+def agrupar_por_prefijo(postings, max_postings=MAX_POSTINGS):
+    """
+    Reparte los tokens en grupos por prefijo de modo que ningún grupo supere
+    `max_postings` posiciones, salvo un token que las supera por sí solo (ver
+    archivos_indice, que los parte). Devuelve {prefijo: [tokens]}; cada token
+    va al grupo del prefijo más largo que le corresponde.
+    """
+    grupos = {}
+    pendientes = [("", sorted(postings))]
+    while pendientes:
+        prefijo, tokens = pendientes.pop()
+        total = sum(len(postings[t]) for t in tokens)
+        if total <= max_postings or all(len(t) <= len(prefijo) for t in tokens):
+            grupos[prefijo] = tokens
+            continue
+        largo = len(prefijo) + 1
+        hijos = {}
+        for t in tokens:
+            hijos.setdefault(t[:largo], []).append(t)
+        if len(hijos) == 1 and prefijo in hijos:
+            grupos[prefijo] = tokens
+            continue
+        for hijo, sub in hijos.items():
+            if hijo == prefijo:
+                grupos[prefijo] = sub
+            else:
+                pendientes.append((hijo, sub))
+    return grupos
+
+def archivos_indice(postings, docs, max_postings=MAX_POSTINGS, docs_por_archivo=DOCS_POR_ARCHIVO):
+    """
+    Genera (nombre, contenido JSON) de los archivos del índice de búsqueda:
+    manifest.json, s<N>.json (token -> posiciones codificadas como saltos) y
+    docs-<N>.json ([slug, título] por posición). Los tokens con más de
+    `max_postings` posiciones van a s<N>-0.json, s<N>-1.json, ... de a
+    `max_postings` posiciones; el manifiesto tiene el número de shard de cada
+    prefijo ("shards") y, por cada token partido, su número y la primera
+    posición de cada parte ("partes").
+    """
+    largos = sorted(t for t, ps in postings.items() if len(ps) > max_postings)
+    grupos = agrupar_por_prefijo({t: ps for t, ps in postings.items() if len(ps) <= max_postings}, max_postings)
+    shards = {}
+    for numero, prefijo in enumerate(sorted(grupos)):
+        shards[prefijo] = numero
+        yield f"{CARPETA}/s{numero}.json", _json({token: _saltos(postings[token]) for token in grupos[prefijo]})
+
+    partes = {}
+    for numero, token in enumerate(largos, len(grupos)):
+        ps = postings[token]
+        inicios = []
+        for k, inicio in enumerate(range(0, len(ps), max_postings)):
+            inicios.append(ps[inicio])
+            yield f"{CARPETA}/s{numero}-{k}.json", _json({token: _saltos(ps[inicio:inicio + max_postings])})
+        partes[token] = [numero, inicios]
+
+    for inicio in range(0, len(docs), docs_por_archivo):
+        yield f"{CARPETA}/docs-{inicio // docs_por_archivo}.json", _json(docs[inicio:inicio + docs_por_archivo])
+
+    yield f"{CARPETA}/manifest.json", _json({"docs_por_archivo": docs_por_archivo, "shards": shards,
+                                             "partes": partes})
+
+def _saltos(posiciones):
+    """Posiciones (ordenadas) como diferencias con la anterior; la primera, desde 0."""
+    anterior, saltos = 0, []
+    for posicion in posiciones:
+        saltos.append(posicion - anterior)
+        anterior = posicion
+    return saltos
+
+def _json(datos):
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":"))
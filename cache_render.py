@@ -0,0 +1,82 @@
+import os
+import sqlite3
+
+# Tamaño máximo de la cache en disco antes de descartar lo menos usado
+MAX_BYTES = 512 * 1024 * 1024
+
+ARCHIVO = "render.sqlite"
+
+class CacheRender:
+    """
+    Cache persistente clave -> fragmento renderizado (bytes) en SQLite.
+    Las claves son hashes de las entradas del fragmento (contenido del
+    artículo y versión de las plantillas), así que nunca hay que invalidar:
+    lo que ya no se usa queda último en el orden de uso y se descarta (LRU)
+    cuando la cache supera `max_bytes`.
+    """
+    def __init__(self, carpeta, max_bytes=MAX_BYTES):
+        os.makedirs(carpeta, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(os.path.join(carpeta, ARCHIVO))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entradas ("
+            " clave TEXT PRIMARY KEY, valor BLOB NOT NULL,"
+            " tamano INTEGER NOT NULL, uso INTEGER NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entradas_uso ON entradas (uso)")
+        total, reloj = self._db.execute(
+            "SELECT COALESCE(SUM(tamano), 0), COALESCE(MAX(uso), 0) FROM entradas").fetchone()
+        self._total = total
+        self._reloj = reloj
+
+    def get_many(self, claves):
+        """{clave: valor} de las claves presentes; las marca como recién usadas."""
+        encontrados = {}
+        claves = list(claves)
+        for inicio in range(0, len(claves), 500):
+            lote = claves[inicio:inicio + 500]
+            marcas = ",".join("?" * len(lote))
+            filas = self._db.execute(
+                f"SELECT clave, valor FROM entradas WHERE clave IN ({marcas})", lote)
+            encontrados.update(filas)
+        if encontrados:
+            self._db.executemany("UPDATE entradas SET uso = ? WHERE clave = ?",
+                                 ((self._tick(), c) for c in encontrados))
+        self.hits += len(encontrados)
+        self.misses += len(claves) - len(encontrados)
+        return encontrados
+
+    def put_many(self, items):
+        """Guarda pares (clave, valor) y descarta lo menos usado si hace falta."""
+        for clave, valor in items:
+            anterior = self._db.execute(
+                "SELECT tamano FROM entradas WHERE clave = ?", (clave,)).fetchone()
+            if anterior:
+                self._total -= anterior[0]
+            self._db.execute("INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?)",
+                             (clave, valor, len(valor), self._tick()))
+            self._total += len(valor)
+        self._evict()
+
+    def _tick(self):
+        """Reloj lógico: cada acceso recibe un número mayor que el anterior."""
+        self._reloj += 1
+        return self._reloj
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        sobra = self._total - self.max_bytes
+        liberado, corte = 0, None
+        for uso, tamano in self._db.execute("SELECT uso, tamano FROM entradas ORDER BY uso"):
+            liberado += tamano
+            corte = uso
+            if liberado >= sobra:
+                break
+        self._db.execute("DELETE FROM entradas WHERE uso <= ?", (corte,))
+        self._total -= liberado
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
@@ -0,0 +1,81 @@
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from articulo import Articulo, InvalidArticleError
+
+CAMPOS = ("titulo", "autor", "texto")
+
+def _formato_de(fuente):
+    ext = os.path.splitext(fuente)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".csv":
+        return "csv"
+    raise ValueError(f"No se reconoce el formato de '{fuente}' (usar .jsonl o .csv)")
+
+def _registrar(errors, mensaje):
+    if errors is None:
+        raise InvalidArticleError(mensaje)
+    errors.append(mensaje)
+
+def _desde_registro(registro, n, errors):
+    """Articulo del registro, o None si la fecha (opcional, ISO 8601) es inválida."""
+    fecha = registro.get("fecha") or None
+    if fecha is not None:
+        try:
+            fecha = datetime.fromisoformat(str(fecha))
+        except ValueError:
+            _registrar(errors, f"Línea {n}: fecha inválida ('{fecha}')")
+            return None
+    return Articulo(*(str(registro.get(campo) or "") for campo in CAMPOS), fecha=fecha)
+
+def _leer_jsonl(lineas, errors):
+    for n, linea in enumerate(lineas, 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError:
+            _registrar(errors, f"Línea {n}: JSON inválido")
+            continue
+        if not isinstance(registro, dict):
+            _registrar(errors, f"Línea {n}: se esperaba un objeto JSON")
+            continue
+        art = _desde_registro(registro, n, errors)
+        if art is not None:
+            yield art
+
+def _leer_csv(lineas, errors):
+    lector = csv.DictReader(lineas)
+    faltantes = [c for c in CAMPOS if c not in (lector.fieldnames or [])]
+    if faltantes:
+        _registrar(errors, f"CSV sin columnas: {', '.join(faltantes)}")
+        return
+    for registro in lector:
+        art = _desde_registro(registro, lector.line_num, errors)
+        if art is not None:
+            yield art
+
+def cargar_articulos(fuente, formato=None, errors=None):
+    """
+    Genera Articulo de a uno desde un archivo JSONL o CSV (o stdin con '-'),
+    sin cargar el archivo completo en memoria.
+    Cada registro debe tener los campos titulo, autor y texto, y puede tener
+    una fecha en formato ISO 8601 (campo fecha). Los registros
+    mal formados se agregan a `errors` si se pasa una lista; si no, se lanza
+    InvalidArticleError.
+    """
+    if fuente != "-":
+        formato = formato or _formato_de(fuente)
+    formato = formato or "jsonl"
+    if formato not in ("jsonl", "csv"):
+        raise ValueError(f"Formato desconocido: '{formato}'")
+    archivo = sys.stdin if fuente == "-" else open(fuente, encoding="utf-8", newline="")
+    lector = _leer_csv if formato == "csv" else _leer_jsonl
+    try:
+        yield from lector(archivo, errors)
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
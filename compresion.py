@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Formatos que ya vienen comprimidos: no ganan nada con gzip
+YA_COMPRIMIDOS = {
+    ".gz", ".br", ".zip", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif",
+    ".woff", ".woff2", ".mp3", ".mp4", ".pdf",
+}
+
+# Hash del contenido de cada archivo comprimido en la corrida anterior
+ESTADO = ".gzip.json"
+
+def debe_comprimir(nombre: str) -> bool:
+    return not nombre.startswith(".") and os.path.splitext(nombre)[1].lower() not in YA_COMPRIMIDOS
+
+def _actualizar(path, clave_anterior):
+    """Comprime `path` a `path.gz` si su contenido cambió. Devuelve (clave, escrito)."""
+    with open(path, "rb") as f:
+        datos = f.read()
+    clave = hashlib.sha1(datos).hexdigest()
+    if clave == clave_anterior and os.path.exists(path + ".gz"):
+        return clave, False
+    # mtime=0: el .gz depende sólo del contenido (builds reproducibles)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(datos, compresslevel=9, mtime=0))
+    return clave, True
+
+def _cargar_estado(carpeta):
+    try:
+        with open(os.path.join(carpeta, ESTADO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def borrar_comprimidos(carpeta):
+    """
+    Borra los .gz que dejó comprimir_directorio en `carpeta` (según su
+    estado) y el estado, para que un build sin compresión no deje .gz
+    viejos que un servidor con gzip_static serviría en lugar de las páginas.
+    Devuelve las rutas relativas de los .gz borrados.
+    """
+    borrados = []
+    for rel in sorted(_cargar_estado(carpeta)):
+        path = os.path.join(carpeta, rel + ".gz")
+        if os.path.exists(path):
+            os.remove(path)
+            borrados.append(rel + ".gz")
+    estado_path = os.path.join(carpeta, ESTADO)
+    if os.path.exists(estado_path):
+        os.remove(estado_path)
+    return borrados
+
+def comprimir_directorio(carpeta, workers=None):
+    """
+    Escribe un .gz al lado de cada archivo de `carpeta` (recursivo), con el
+    nivel máximo y en paralelo. Sólo recomprime los archivos cuyo contenido
+    cambió desde la corrida anterior y borra los .gz de archivos eliminados.
+    Devuelve las rutas relativas que se comprimieron.
+    """
+    anterior = _cargar_estado(carpeta)
+
+    relativas = []
+    for raiz, carpetas, archivos in os.walk(carpeta):
+        # Igual que los archivos ocultos, las carpetas ocultas (p. ej. .shards) no se publican
+        carpetas[:] = [c for c in carpetas if not c.startswith(".")]
+        for nombre in archivos:
+            if debe_comprimir(nombre):
+                relativas.append(os.path.relpath(os.path.join(raiz, nombre), carpeta))
+    relativas.sort()
+
+    with ThreadPoolExecutor(workers) as pool:
+        resultados = list(pool.map(
+            lambda rel: _actualizar(os.path.join(carpeta, rel), anterior.get(rel)), relativas))
+
+    actual = {}
+    comprimidos = []
+    for rel, (clave, escrito) in zip(relativas, resultados):
+        actual[rel] = clave
+        if escrito:
+            comprimidos.append(rel)
+
+    for rel in anterior:
+        if rel not in actual:
+            path = os.path.join(carpeta, rel + ".gz")
+            if os.path.exists(path):
+                os.remove(path)
+
+    with open(os.path.join(carpeta, ESTADO), "w", encoding="utf-8") as f:
+        json.dump(actual, f, ensure_ascii=False)
+    return comprimidos
@@ -1,14 +1,95 @@
+import json
 import os
+import struct
+import sys
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from compresion import YA_COMPRIMIDOS
 
-def crear_zip_proyecto():
+# Archivo con lo empaquetado la última vez (para el modo incremental)
+MANIFIESTO = ".crear_zip.json"
+
+# Archivos que se comprimen juntos en el pool de hilos
+LOTE = 256
+
+def _comprimir(path, arcname):
+    """
+    ZipInfo y datos ya comprimidos de un archivo. Los formatos que ya vienen
+    comprimidos se guardan tal cual (ZIP_STORED). zlib libera el GIL, así
+    que varios hilos comprimen en paralelo.
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+    with open(path, "rb") as f:
+        datos = f.read()
+    zinfo.file_size = len(datos)
+    zinfo.CRC = zlib.crc32(datos)
+    if os.path.splitext(path)[1].lower() in YA_COMPRIMIDOS:
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        compresor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        datos = compresor.compress(datos) + compresor.flush()
+    zinfo.compress_size = len(datos)
+    return zinfo, datos
+
+def _datos_crudos(f, zinfo):
+    """Datos comprimidos de una entrada de un zip existente, sin descomprimirlos."""
+    f.seek(zinfo.header_offset)
+    cabecera = f.read(30)
+    largo_nombre, largo_extra = struct.unpack("<HH", cabecera[26:30])
+    f.seek(zinfo.header_offset + 30 + largo_nombre + largo_extra)
+    return f.read(zinfo.compress_size)
+
+def _agregar_crudo(zipf, zinfo, datos):
+    """
+    Agrega una entrada cuyos datos ya están comprimidos. zipfile no tiene una
+    API pública para esto: se escribe la cabecera local y los datos y se
+    registra la entrada para el directorio central que escribe close().
+    """
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader(zinfo.file_size > zipfile.ZIP64_LIMIT))
+    zipf.fp.write(datos)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+    zipf._didModify = True
+
+def _cargar_manifiesto():
+    try:
+        with open(MANIFIESTO, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def crear_zip_proyecto(incremental=False, workers=None, verbose=False):
+    """
+    Empaqueta el proyecto. Con incremental=True las entradas que no cambiaron
+    (mismo tamaño y fecha de modificación que en el manifiesto del paquete
+    anterior) se copian comprimidas del zip anterior en lugar de volver a
+    comprimirse. Devuelve el nombre del zip.
+    """
     # Configuración
     nombre_zip = f"noticias_del_fuego_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
     archivos_a_incluir = [
         'articulo.py',
         'parser_html.py',
         'runner.py',
+        'cargador.py',
+        'indice_invertido.py',
+        'plantilla.py',
+        'busqueda.py',
+        'compresion.py',
+        'cache_render.py',
+        'estadisticas.py',
+        'relacionados.py',
+        'duplicados.py',
+        'instrumentacion.py',
+        'recursos.py',
+        'watch.py',
+        'distribuido.py',
+        'minificar.py',
         'test_parser.py',
         'parse.py',
         'LICENSE',
@@ -18,33 +99,84 @@ def crear_zip_proyecto():
     ]
     carpetas_a_incluir = [
         'static' ,
+        'benchmarks',
         'output',
     ]
 
-    # Crear el archivo ZIP
-    with zipfile.ZipFile(nombre_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Agregar archivos individuales
-        for archivo in archivos_a_incluir:
-            if os.path.exists(archivo):
-                zipf.write(archivo)
-                print(f"Agregado: {archivo}")
-            else:
-                print(f"Advertencia: {archivo} no encontrado, omitiendo")
-
-        # Agregar carpetas y su contenido
-        for carpeta in carpetas_a_incluir:
-            if os.path.exists(carpeta):
-                for root, dirs, files in os.walk(carpeta):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, start=os.path.dirname(carpeta))
-                        zipf.write(file_path, arcname)
+    # (ruta, nombre dentro del zip)
+    entradas = []
+    for archivo in archivos_a_incluir:
+        if os.path.exists(archivo):
+            entradas.append((archivo, archivo))
+        else:
+            print(f"Advertencia: {archivo} no encontrado, omitiendo")
+    for carpeta in carpetas_a_incluir:
+        if os.path.exists(carpeta):
+            for root, dirs, files in os.walk(carpeta):
+                # Como en compresion.comprimir_directorio: lo oculto (.shards,
+                # .manifest.json, .gzip.json) y los __pycache__ no se empaquetan
+                dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+                for file in sorted(f for f in files if not f.startswith(".")):
+                    file_path = os.path.join(root, file)
+                    entradas.append((file_path, os.path.relpath(file_path, start=os.path.dirname(carpeta))))
+        else:
+            print(f"Advertencia: carpeta {carpeta} no encontrada, omitiendo")
+
+    firmas = {}
+    for file_path, arcname in entradas:
+        st = os.stat(file_path)
+        firmas[arcname] = [st.st_size, st.st_mtime_ns]
+
+    # Paquete anterior: entradas sin cambios según el manifiesto
+    anterior, previas = None, {}
+    manifiesto = _cargar_manifiesto() if incremental else {}
+    if manifiesto.get("zip") and os.path.exists(manifiesto["zip"]):
+        anterior = zipfile.ZipFile(manifiesto["zip"])
+        vistas = manifiesto.get("entradas", {})
+        for zinfo in anterior.infolist():
+            if vistas.get(zinfo.filename) == firmas.get(zinfo.filename):
+                previas[zinfo.filename] = zinfo
+
+    # Crear el archivo ZIP (con otro nombre hasta terminar: puede ser el mismo que el anterior)
+    contadores = {"comprimidos": 0, "sin comprimir": 0, "reutilizados": 0}
+    temporal = nombre_zip + ".tmp"
+    try:
+        with zipfile.ZipFile(temporal, 'w', zipfile.ZIP_DEFLATED) as zipf, \
+                ThreadPoolExecutor(workers) as pool:
+            for inicio in range(0, len(entradas), LOTE):
+                lote = entradas[inicio:inicio + LOTE]
+                nuevas = [(p, a) for p, a in lote if a not in previas]
+                comprimidas = dict(zip((a for _, a in nuevas),
+                                       pool.map(lambda pa: _comprimir(*pa), nuevas)))
+                for file_path, arcname in lote:
+                    if arcname in previas:
+                        viejo = previas[arcname]
+                        datos = _datos_crudos(anterior.fp, viejo)
+                        zinfo = zipfile.ZipInfo(arcname, viejo.date_time)
+                        for campo in ("compress_type", "external_attr", "CRC", "compress_size", "file_size"):
+                            setattr(zinfo, campo, getattr(viejo, campo))
+                        contadores["reutilizados"] += 1
+                    else:
+                        zinfo, datos = comprimidas[arcname]
+                        contadores["comprimidos" if zinfo.compress_type == zipfile.ZIP_DEFLATED
+                                   else "sin comprimir"] += 1
+                    _agregar_crudo(zipf, zinfo, datos)
+                    if verbose:
                         print(f"Agregado: {file_path} como {arcname}")
-            else:
-                print(f"Advertencia: carpeta {carpeta} no encontrada, omitiendo")
+    finally:
+        if anterior:
+            anterior.close()
+    os.replace(temporal, nombre_zip)
+
+    with open(MANIFIESTO, "w", encoding="utf-8") as f:
+        json.dump({"zip": nombre_zip, "entradas": firmas}, f, ensure_ascii=False)
 
     print(f"\nArchivo ZIP creado exitosamente: {nombre_zip}")
+    print(f"Entradas: {len(entradas)} ({contadores['comprimidos']} comprimidas, "
+          f"{contadores['sin comprimir']} guardadas sin comprimir, "
+          f"{contadores['reutilizados']} reutilizadas del paquete anterior)")
     print(f"Tamaño: {os.path.getsize(nombre_zip)/1024:.2f} KB")
+    return nombre_zip
 
 if __name__ == "__main__":
-    crear_zip_proyecto()
\ No newline at end of file
+    crear_zip_proyecto(incremental="--incremental" in sys.argv[1:], verbose="-v" in sys.argv[1:])
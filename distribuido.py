@@ -0,0 +1,531 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import subprocess
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime
+from cargador import cargar_articulos
+import duplicados
+from estadisticas import Estadisticas
+from indice_invertido import IndiceInvertido, tokenizar
+from parser_html import PAGE_SIZE, RECURSOS, ParserHtml, _hash, mensaje_duplicado, validar_articulo
+import recursos
+import relacionados
+
+# Carpeta (dentro de la salida) con los resultados parciales de cada etapa
+PARCIALES = ".shards"
+
+# Resultado de planificar() dentro de PARCIALES
+PLAN = "plan"
+
+# Formas de repartir los artículos: rangos contiguos de posiciones o hash del slug
+MODOS = ("posicion", "hash")
+
+class ShardFaltanteError(Exception):
+    """Falta el resultado de algún shard o no corresponde a este build."""
+    pass
+
+def posiciones_del_shard(slugs, numero, total, modo="posicion"):
+    """Posiciones (en orden) de los artículos que le tocan al shard `numero` de `total`."""
+    if modo == "posicion":
+        n = len(slugs)
+        return list(range(numero * n // total, (numero + 1) * n // total))
+    if modo == "hash":
+        return [i for i, slug in enumerate(slugs)
+                if int(hashlib.sha1(slug.encode("utf-8")).hexdigest()[:8], 16) % total == numero]
+    raise ValueError(f"Modo desconocido: '{modo}' (usar 'posicion' o 'hash')")
+
+def _parcial(output_dir, etapa, numero=None):
+    nombre = f"{etapa}.json" if numero is None else f"{etapa}-{numero}.json"
+    return os.path.join(output_dir, PARCIALES, nombre)
+
+def _guardar(path, datos):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def _leer(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        raise ShardFaltanteError(f"Falta {os.path.basename(path)} en {os.path.dirname(path)}")
+
+def firmar(fuente, numero, total, output_dir="output", related=0, umbral=duplicados.UMBRAL):
+    """
+    Primera etapa, en cada nodo: valida los registros numero, numero + total,
+    numero + 2 * total, ... de la fuente y calcula su firma para el descarte
+    de duplicados (con related, también los términos de cada texto, para el
+    idf). No descarta nada: eso depende de todos los registros anteriores y
+    lo decide planificar(). El resultado (un registro por línea) queda en
+    output_dir/.shards/firmas-N.json.
+    """
+    errores_fuente = []
+    repetidos = duplicados.Deduplicador(umbral)
+    autores = {}
+    fuente_vistos = 0
+    leidos = 0
+    path = _parcial(output_dir, "firmas", numero)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        for r, art in enumerate(cargar_articulos(fuente, errors=errores_fuente)):
+            leidos = r + 1
+            # Los errores de la fuente son los mismos en todos los nodos; los anota el 0
+            if numero == 0:
+                for error in errores_fuente[fuente_vistos:]:
+                    f.write(json.dumps({"r": r, "errores": [error]}, ensure_ascii=False) + "\n")
+            fuente_vistos = len(errores_fuente)
+            if r % total != numero:
+                continue
+            mensajes = []
+            fila = validar_articulo(art, mensajes, autores)
+            if fila is None:
+                if mensajes:
+                    f.write(json.dumps({"r": r, "errores": mensajes}, ensure_ascii=False) + "\n")
+                continue
+            titulo, autor, texto, fecha = fila
+            tokens = tokenizar(texto)
+            clave, bandas, huella = repetidos.firmar(tokens)
+            registro = {
+                "r": r,
+                "fila": [titulo, autor, fecha.isoformat() if fecha else None, _hash(texto)],
+                "clave": clave.hex(),
+                "bandas": bandas,
+                "huella": format(huella, "x") if bandas is not None else None,
+            }
+            if related:
+                registro["terminos"] = list(dict.fromkeys(tokens))
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        if numero == 0:
+            for error in errores_fuente[fuente_vistos:]:
+                f.write(json.dumps({"r": leidos, "errores": [error]}, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"total": total, "leidos": leidos, "related": related}) + "\n")
+    os.replace(path + ".tmp", path)
+
+def _lineas(path):
+    """Objetos JSON de un archivo con uno por línea (ver firmar), sin cargarlo completo."""
+    try:
+        f = open(path, encoding="utf-8")
+    except OSError:
+        raise ShardFaltanteError(f"Falta {os.path.basename(path)} en {os.path.dirname(path)}")
+    with f:
+        for linea in f:
+            yield json.loads(linea)
+
+def planificar(output_dir, total, umbral=duplicados.UMBRAL):
+    """
+    Segunda etapa, una sola vez: recorre las firmas de todos los nodos en el
+    orden de la fuente y decide qué artículos se descartan por duplicados,
+    sin tokenizar ni leer ningún texto. Escribe output_dir/.shards/plan.json
+    con los errores (en el mismo orden que un build en un solo nodo) y, por
+    cada artículo que queda, su registro en la fuente, título, autor, fecha y
+    hash del texto; con related, también la frecuencia de cada término.
+    """
+    repetidos = duplicados.Deduplicador(umbral)
+    pies = []
+    def registros(numero):
+        for registro in _lineas(_parcial(output_dir, "firmas", numero)):
+            # La última línea es el pie, sin "r"
+            if "r" in registro:
+                yield registro
+            else:
+                pies.append(registro)
+    errores = []
+    articulos = []
+    df = Counter()
+    for registro in heapq.merge(*(registros(n) for n in range(total)), key=lambda reg: reg["r"]):
+        if "errores" in registro:
+            errores.extend(registro["errores"])
+            continue
+        titulo = registro["fila"][0]
+        huella = int(registro["huella"], 16) if registro["huella"] is not None else None
+        repetido = repetidos.registrar((bytes.fromhex(registro["clave"]), registro["bandas"], huella), titulo)
+        if repetido:
+            errores.append(mensaje_duplicado(titulo, *repetido))
+            continue
+        articulos.append([registro["r"]] + registro["fila"])
+        if "terminos" in registro:
+            df.update(registro["terminos"])
+    if len(pies) != total or any(p["total"] != total or p["leidos"] != pies[0]["leidos"] for p in pies):
+        raise ShardFaltanteError("Las firmas no corresponden a la misma fuente ni a la misma cantidad de shards")
+    _guardar(_parcial(output_dir, PLAN), {
+        "total": total,
+        "errores": errores,
+        "articulos": articulos,
+        "df": df if pies[0]["related"] else None,
+    })
+
+class ParserDistribuido(ParserHtml):
+    """
+    Build repartido en varios nodos (o procesos) con una salida compartida.
+    Las etapas, en orden:
+
+    - firmar() en cada nodo: valida una parte de los registros de la fuente
+      y calcula sus firmas de duplicados (y sus términos, con related);
+    - planificar() una vez: decide los descartes con esas firmas y deja en
+      output_dir/.shards/plan.json los artículos que quedan, sin sus textos;
+    - vectorizar() en cada nodo, sólo con related: vectores TF-IDF de sus
+      artículos y sus listas invertidas recortadas;
+    - generar_shard() en cada nodo: renderiza y escribe las páginas de sus
+      artículos y guarda en output_dir/.shards sus tarjetas, relacionados,
+      conteos por autor y postings del índice;
+    - combinar() una vez: escribe con esos resultados el índice, las páginas
+      por inicial, el resumen, la búsqueda, los recursos y el manifiesto, sin
+      renderizar, tokenizar ni leer ningún artículo.
+
+    El ParserDistribuido se arma con el plan: títulos, autores y slugs de
+    todos los artículos (los enlaces anterior/siguiente entre shards salen de
+    ahí), pero cada nodo lee de la fuente sólo los textos de sus artículos.
+    Con el mismo timestamp (o deterministic=True) el resultado es idéntico
+    al de ParserHtml.generate_html en un solo nodo.
+    """
+    def __init__(self, output_dir="output", timestamp=None, **kwargs):
+        # Fecha común a todos los nodos (datetime); None: la de _build_timestamp
+        self.timestamp = timestamp
+        self._shard = None
+        self._combinados = None
+        plan = _leer(_parcial(output_dir, PLAN))
+        self._registros = [fila[0] for fila in plan["articulos"]]
+        self._claves = [fila[4] for fila in plan["articulos"]]
+        self._df = plan["df"]
+        filas = ((titulo, autor, "", datetime.fromisoformat(fecha) if fecha else None)
+                 for _, titulo, autor, fecha, _ in plan["articulos"])
+        super().__init__(filas, output_dir=output_dir, errors=plan["errores"], columnar=True, **kwargs)
+
+    def _iter_normalize(self, filas):
+        # Las filas del plan ya están validadas y sin duplicados
+        return filas
+
+    def _cargar_textos(self, fuente, posiciones):
+        """Lee de la fuente sólo los textos de `posiciones` y los deja en el store."""
+        buscadas = {self._registros[i]: i for i in posiciones}
+        if not buscadas:
+            return
+        for r, art in enumerate(cargar_articulos(fuente, errors=[])):
+            i = buscadas.pop(r, None)
+            if i is not None:
+                self.store.textos[i] = art.texto.strip()
+                if not buscadas:
+                    break
+
+    def vectorizar(self, fuente, numero, total, modo="posicion"):
+        """
+        Vectores TF-IDF (ver relacionados.vector) de los artículos del shard
+        `numero`, con el idf de todo el corpus que calculó planificar(). Guarda
+        la consulta de cada artículo y las listas invertidas del shard,
+        recortadas a las MAX_POSTINGS entradas de mayor peso por término.
+        """
+        if self._df is None:
+            raise ShardFaltanteError("El plan se armó sin related: las firmas no tienen los términos")
+        mias = posiciones_del_shard(self.slugs, numero, total, modo)
+        self._cargar_textos(fuente, mias)
+        idf = relacionados.idf_de(self._df, len(self.store))
+        consultas = []
+        postings = {}
+        for i in mias:
+            recortado = relacionados.vector(Counter(tokenizar(self.store.textos[i])).items(), idf, self._df)
+            consultas.append([i, recortado[:relacionados.TERMINOS_POR_ARTICULO]])
+            for p, t in recortado:
+                postings.setdefault(t, []).append((p, i))
+        _guardar(_parcial(self.output_dir, "vectores", numero), {
+            "total": total,
+            "modo": modo,
+            "articulos": len(self.store),
+            "consultas": consultas,
+            "postings": {t: heapq.nlargest(relacionados.MAX_POSTINGS, lista) for t, lista in postings.items()},
+        })
+
+    def _modelo_relacionados(self, numero, total, modo):
+        """Relacionados con las listas invertidas de todos los shards y las consultas de este."""
+        postings = {}
+        for n in range(total):
+            parcial = _leer(_parcial(self.output_dir, "vectores", n))
+            if (parcial["total"], parcial["modo"], parcial["articulos"]) != (total, modo, len(self.store)):
+                raise ShardFaltanteError("Los vectores no corresponden a los artículos de este build")
+            for t, lista in parcial["postings"].items():
+                postings.setdefault(t, []).extend(map(tuple, lista))
+            if n == numero:
+                consultas = {i: [tuple(pt) for pt in consulta] for i, consulta in parcial["consultas"]}
+        return relacionados.Relacionados.desde_partes(consultas, postings)
+
+    def generar_shard(self, fuente, numero, total, modo="posicion", incremental=False, workers=1,
+                      related=0, static_dir=None, deterministic=False, minify=False):
+        """
+        Escribe las páginas de los artículos del shard `numero` (de `total`) y
+        su resultado parcial. Con related hace falta que antes cada nodo haya
+        corrido vectorizar(). Devuelve la lista de archivos escritos.
+        """
+        mias = posiciones_del_shard(self.slugs, numero, total, modo)
+        self._cargar_textos(fuente, mias)
+        self._shard = numero
+        try:
+            self._publicar_recursos(static_dir, minify)
+        finally:
+            self._shard = None
+        anterior, vigente = self._load_manifest()
+        self._previas = anterior if incremental and vigente else {}
+        self._manifest = {}
+        self._escritos = []
+        timestamp = self._build_timestamp(deterministic).strftime("%d/%m/%Y %H:%M:%S")
+        st = self.store
+
+        with self.medicion.fase("relacionados"):
+            self._relacionados = None
+            if related:
+                self._relacionados, _ = relacionados.calcular(
+                    self.slugs, self._claves, None, relacionados.cargar_estado(self.output_dir), related, mias,
+                    modelo=lambda: self._modelo_relacionados(numero, total, modo))
+
+        with self.medicion.fase("articulos"):
+            claves = [self._article_key(i) for i in mias]
+            pendientes = [i for i, clave in zip(mias, claves) if self._needs_write(f"{self.slugs[i]}.html", clave)]
+            self._write_articles(pendientes, timestamp, workers)
+
+        with self.medicion.fase("parcial"):
+            autores = {}
+            for i in mias:
+                fila = autores.get(st.autores[i])
+                palabras = len(st.textos[i].split())
+                if fila is None:
+                    autores[st.autores[i]] = [i, 1, palabras]
+                else:
+                    fila[1] += 1
+                    fila[2] += palabras
+            local = IndiceInvertido(st.textos[i] for i in mias)
+            _guardar(_parcial(self.output_dir, "shard", numero), {
+                "shard": numero,
+                "total": total,
+                "articulos": len(st),
+                "layout": self._layout_clave,
+                "related": related,
+                "posiciones": mias,
+                "claves": claves,
+                "snippets": [self._snippet(i) for i in mias],
+                "tarjetas": [self._render_card(i) for i in mias],
+                "relacionados": [self._relacionados[i] for i in mias] if related else None,
+                "autores": [[autor] + fila for autor, fila in autores.items()],
+                "longitudes": [len(st.textos[i]) for i in mias],
+                "postings": {t: [mias[p] for p in ps] for t, ps in local.postings.items()},
+            })
+        return self._escritos
+
+    def combinar(self, total, incremental=False, workers=1, page_size=PAGE_SIZE, search=True,
+                 compress=False, deterministic=False, static_dir=None, informe=None, minify=False):
+        """
+        Combina los resultados de los `total` shards y escribe el resto del
+        sitio. Lanza ShardFaltanteError si falta algún shard o si los shards
+        no cubren exactamente los artículos de este build. Devuelve la lista
+        de archivos escritos (sin las páginas de artículos, que ya escribieron
+        los shards).
+        """
+        parciales = [_leer(_parcial(self.output_dir, "shard", numero)) for numero in range(total)]
+        n = len(self.store)
+        cubiertas = sorted(i for p in parciales for i in p["posiciones"])
+        if any(p["articulos"] != n or p["total"] != total for p in parciales) or cubiertas != list(range(n)):
+            raise ShardFaltanteError("Los shards no corresponden a los artículos de este build")
+        related = parciales[0]["related"]
+
+        combinados = {
+            "parciales": parciales,
+            "claves": [None] * n,
+            "snippets": [None] * n,
+            "tarjetas": [None] * n,
+            "vecinos": [None] * n if related else None,
+            "autores": {},
+            "longitudes": array("L"),
+        }
+        postings = {}
+        for parcial in parciales:
+            for k, i in enumerate(parcial["posiciones"]):
+                for campo in ("claves", "snippets", "tarjetas"):
+                    combinados[campo][i] = parcial[campo][k]
+                if related:
+                    combinados["vecinos"][i] = parcial["relacionados"][k]
+            for token, ps in parcial["postings"].items():
+                postings.setdefault(token, []).extend(ps)
+            for autor, primera, cantidad, palabras in parcial["autores"]:
+                fila = combinados["autores"].setdefault(autor, [primera, 0, 0])
+                fila[0] = min(fila[0], primera)
+                fila[1] += cantidad
+                fila[2] += palabras
+            combinados["longitudes"].extend(parcial["longitudes"])
+        for ps in postings.values():
+            ps.sort()
+        self._indice = IndiceInvertido.desde_postings(postings)
+        self._combinados = combinados
+
+        try:
+            escritos = self.generate_html(incremental=incremental, workers=workers, page_size=page_size,
+                                          search=search, compress=compress, deterministic=deterministic,
+                                          related=related, informe=informe, static_dir=static_dir,
+                                          minify=minify)
+        finally:
+            self._combinados = None
+        shutil.rmtree(os.path.join(self.output_dir, PARCIALES))
+        return escritos
+
+    # Redefiniciones para los shards y para combinar()
+
+    def _build_timestamp(self, deterministic=False):
+        return self.timestamp or super()._build_timestamp(deterministic)
+
+    def _publicar_recursos(self, static_dir=None, minify=False):
+        escritos = super()._publicar_recursos(static_dir, minify)
+        if self._combinados is not None and any(p["layout"] != self._layout_clave
+                                                for p in self._combinados["parciales"]):
+            raise ShardFaltanteError("Los shards se generaron con otros recursos o con otra versión de la plantilla")
+        return escritos
+
+    def _copiar_recursos(self, origen):
+        if self._shard is None:
+            return super()._copiar_recursos(origen)
+        # Los publica combinar(); al shard sólo le hacen falta los nombres
+        return recursos.mapa(origen, RECURSOS), []
+
+    # En combinar() no hay textos: lo que depende de ellos viene de los shards
+
+    def _render_card(self, i):
+        if self._combinados is None:
+            return super()._render_card(i)
+        return self._combinados["tarjetas"][i]
+
+    def _snippet(self, i):
+        if self._combinados is None:
+            return super()._snippet(i)
+        return self._combinados["snippets"][i]
+
+    def _article_key(self, i):
+        if self._combinados is None:
+            return super()._article_key(i)
+        return self._combinados["claves"][i]
+
+    def calcular_estadisticas(self, top: int = 20):
+        if self._combinados is None:
+            return super().calcular_estadisticas(top)
+        autores = self._combinados["autores"]
+        stats = Estadisticas(top, self.indice)
+        stats.por_autor = {autor: fila[1:] for autor, fila in sorted(autores.items(), key=lambda af: af[1][0])}
+        stats.total_articulos = sum(c for c, _ in stats.por_autor.values())
+        stats.total_palabras = sum(p for _, p in stats.por_autor.values())
+        stats.longitudes = self._combinados["longitudes"]
+        return stats
+
+    def _related_positions(self, k):
+        if self._combinados is None:
+            return super()._related_positions(k)
+        vecinos = self._combinados["vecinos"]
+        relacionados.guardar_estado(self.output_dir, relacionados.estado_de(self.slugs, self._claves, vecinos, k))
+        return vecinos
+
+    def _write_articles(self, pendientes, timestamp, workers):
+        # En combinar() las páginas de los artículos ya las escribieron los shards
+        if self._combinados is None:
+            super()._write_articles(pendientes, timestamp, workers)
+
+def _en_paralelo(etapa, comandos):
+    """Corre un proceso por comando y espera a todos; falla si alguno termina con error."""
+    procesos = [subprocess.Popen(comando) for comando in comandos]
+    for numero, proceso in enumerate(procesos):
+        if proceso.wait() != 0:
+            raise ShardFaltanteError(f"El nodo {numero} de la etapa {etapa} terminó con código {proceso.returncode}")
+
+def construir_local(fuente, total, output_dir="output", modo="posicion", incremental=False,
+                    deterministic=False, compress=False, minify=False, related=0):
+    """
+    Build completo con `total` procesos locales por etapa (firmar, vectorizar
+    y shard) y planificar() y combinar() en este proceso. Devuelve el
+    ParserDistribuido que combinó (con los errores de la fuente en .errors).
+    """
+    shutil.rmtree(os.path.join(output_dir, PARCIALES), ignore_errors=True)
+    script = [sys.executable, os.path.abspath(__file__)]
+    comun = [fuente, str(total), "--salida", output_dir]
+    _en_paralelo("firmar", [script + ["firmar"] + comun + ["--numero", str(numero), "--related", str(related)]
+                            for numero in range(total)])
+    planificar(output_dir, total)
+    if related:
+        _en_paralelo("vectorizar", [script + ["vectorizar"] + comun + ["--numero", str(numero), "--modo", modo]
+                                    for numero in range(total)])
+    comando = script + ["shard"] + comun + ["--modo", modo, "--related", str(related)]
+    if incremental:
+        comando.append("--incremental")
+    if minify:
+        comando.append("--minify")
+    if deterministic:
+        comando.append("--deterministic")
+        timestamp = None
+    else:
+        timestamp = datetime.now()
+        comando += ["--timestamp", timestamp.isoformat()]
+    _en_paralelo("shard", [comando + ["--numero", str(numero)] for numero in range(total)])
+    parser = ParserDistribuido(output_dir, timestamp=timestamp)
+    parser.combinar(total, incremental=incremental, deterministic=deterministic, compress=compress,
+                    minify=minify)
+    return parser
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python distribuido.py")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    firmas = comandos.add_parser("firmar", help="valida una parte de la fuente y calcula sus firmas de duplicados")
+    plan = comandos.add_parser("planificar", help="decide los descartes y arma el plan del build")
+    vectores = comandos.add_parser("vectorizar", help="vectores TF-IDF de un shard (sólo con --related)")
+    shard = comandos.add_parser("shard", help="genera las páginas de un shard y su resultado parcial")
+    combinar = comandos.add_parser("combinar", help="combina los shards y escribe el resto del sitio")
+    local = comandos.add_parser("local", help="build completo con un proceso por shard")
+    for sub in (firmas, vectores, shard, local):
+        sub.add_argument("fuente", help="archivo .jsonl o .csv con los artículos")
+    for sub in (firmas, plan, vectores, shard, combinar, local):
+        sub.add_argument("total", type=int, help="cantidad de shards")
+        sub.add_argument("--salida", default="output")
+    for sub in (firmas, vectores, shard):
+        sub.add_argument("--numero", type=int, required=True)
+    for sub in (shard, combinar, local):
+        sub.add_argument("--incremental", action="store_true")
+        sub.add_argument("--deterministic", action="store_true")
+        sub.add_argument("--minify", action="store_true")
+    for sub in (vectores, shard, local):
+        sub.add_argument("--modo", choices=MODOS, default="posicion")
+    for sub in (firmas, shard, local):
+        sub.add_argument("--related", type=int, default=0,
+                         help="artículos relacionados por página (0: no se calculan)")
+    for sub in (shard, combinar):
+        sub.add_argument("--timestamp", type=datetime.fromisoformat, default=None,
+                         help="fecha del build (ISO 8601), la misma en todos los nodos")
+    for sub in (combinar, local):
+        sub.add_argument("--compress", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.comando == "firmar":
+        firmar(args.fuente, args.numero, args.total, args.salida, args.related)
+        return 0
+    if args.comando == "planificar":
+        planificar(args.salida, args.total)
+        return 0
+    if args.comando == "local":
+        distribuido = construir_local(args.fuente, args.total, args.salida, args.modo,
+                                      args.incremental, args.deterministic, args.compress, args.minify,
+                                      args.related)
+    else:
+        distribuido = ParserDistribuido(args.salida, timestamp=getattr(args, "timestamp", None))
+        if args.comando == "vectorizar":
+            distribuido.vectorizar(args.fuente, args.numero, args.total, args.modo)
+            return 0
+        if args.comando == "shard":
+            distribuido.generar_shard(args.fuente, args.numero, args.total, args.modo, args.incremental,
+                                      related=args.related, deterministic=args.deterministic,
+                                      minify=args.minify)
+            return 0
+        distribuido.combinar(args.total, args.incremental, deterministic=args.deterministic,
+                             compress=args.compress, minify=args.minify)
+    for error in distribuido.errors:
+        print(f"Advertencia: {error}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import functools
+import hashlib
+import random
+import sys
+import zlib
+from array import array
+from indice_invertido import tokenizar
+
+# Similitud (Jaccard estimada entre shingles) a partir de la cual dos textos
+# se consideran la misma noticia
+UMBRAL = 0.8
+
+# Tamaño de la firma MinHash
+BINS = 128
+
+# Palabras por shingle
+SHINGLE = 3
+
+# Textos guardados por cubeta del LSH. En un corpus con frases repetidas
+# (plantillas, firmas) muchas firmas coinciden en una banda sin ser
+# duplicados; cortar las cubetas evita que cada texto se compare con todos.
+MAX_CUBETA = 8
+
+# Candidatos que se verifican por texto
+MAX_CANDIDATOS = 8
+
+# Con menos shingles un solo cambio altera gran parte del texto y la
+# similitud no sirve para decidir; esos textos sólo se comparan exactos.
+MIN_SHINGLES = 16
+
+_VACIO = 0xFFFFFFFF
+_BYTE_BAJO = 0 if sys.byteorder == "little" else 3
+
+def _filas_por_banda(bins, umbral):
+    """
+    Filas por banda del LSH: la de mayor umbral implícito (1/b)^(1/r) que no
+    pase `umbral`, para no perder pares cercanos al umbral.
+    """
+    mejor = 1
+    for r in range(1, bins + 1):
+        if bins % r == 0 and (r / bins) ** (1 / r) <= umbral:
+            mejor = r
+    return mejor
+
+@functools.lru_cache(maxsize=None)
+def _sondeos(bins):
+    """Orden fijo (pseudoaleatorio) en que cada cubeta vacía busca una llena."""
+    return [random.Random(b).sample(range(bins), bins) for b in range(bins)]
+
+def firma(tokens, bins=BINS, shingle=SHINGLE):
+    """
+    Firma MinHash de una permutación: un hash por shingle, repartido en
+    `bins` cubetas. Cada cubeta vacía copia el valor de la primera cubeta
+    llena de su orden de sondeo (densificación), así las firmas de textos
+    cortos siguen estimando bien la similitud.
+    Devuelve None si el texto tiene menos de MIN_SHINGLES shingles.
+    """
+    n = len(tokens) - shingle + 1
+    if n < MIN_SHINGLES:
+        return None
+    minimos = [_VACIO] * bins
+    for i in range(n):
+        h = zlib.crc32(" ".join(tokens[i:i + shingle]).encode("utf-8"))
+        b = h % bins
+        v = h // bins
+        if v < minimos[b]:
+            minimos[b] = v
+    valores = array("I", minimos)
+    if _VACIO in minimos:
+        sondeos = _sondeos(bins)
+        for b, v in enumerate(minimos):
+            if v == _VACIO:
+                for d in sondeos[b]:
+                    if minimos[d] != _VACIO:
+                        valores[b] = minimos[d]
+                        break
+    return valores
+
+def huella(f) -> int:
+    """Los 8 bits bajos de cada valor de la firma, empaquetados en un entero."""
+    return int.from_bytes(f.tobytes()[_BYTE_BAJO::f.itemsize], "little")
+
+def similitud(a: int, b: int, bins=BINS) -> float:
+    """
+    Jaccard estimada a partir de dos huellas: fracción de bytes iguales,
+    corregida por la probabilidad (1/256) de que coincidan por azar.
+    """
+    iguales = (a ^ b).to_bytes(bins, "little").count(0) / bins
+    return max(0.0, (iguales - 1 / 256) / (1 - 1 / 256))
+
+class Deduplicador:
+    """
+    Detecta textos repetidos a medida que llegan: iguales (hash del texto
+    normalizado) o casi iguales (MinHash + LSH por bandas). Cada texto sólo
+    se compara con los que comparten alguna banda de la firma, así que el
+    costo total es aproximadamente lineal. Con umbral=None sólo se descartan
+    los textos idénticos.
+    """
+    def __init__(self, umbral=UMBRAL, bins=BINS, shingle=SHINGLE):
+        self.umbral = umbral
+        self.bins = bins
+        self.shingle = shingle
+        self.filas = _filas_por_banda(bins, umbral) if umbral is not None else bins
+        self._exactos = {}      # hash del texto -> etiqueta
+        self._huellas = []      # (huella de la firma, etiqueta) de los textos aceptados
+        # Una tabla por banda: hash de los valores de la banda -> índices en _huellas
+        self._bandas = [{} for _ in range(0, bins, self.filas)]
+
+    def agregar(self, texto, etiqueta):
+        """
+        Registra el texto si es nuevo y devuelve None. Si repite uno anterior
+        devuelve (etiqueta del anterior, similitud) y no lo registra.
+        """
+        return self.registrar(self.firmar(tokenizar(texto)), etiqueta)
+
+    def firmar(self, tokens):
+        """
+        (clave exacta, bandas, huella) de los tokens de un texto; bandas y
+        huella son None si el texto sólo se compara exacto. Es la parte cara
+        y no depende de los textos anteriores, así que se puede calcular en
+        otro proceso (ver distribuido.firmar): los hashes de las bandas son
+        estables entre procesos.
+        """
+        clave = hashlib.sha1(" ".join(tokens).encode("utf-8")).digest()
+        if self.umbral is None:
+            return clave, None, None
+        f = firma(tokens, self.bins, self.shingle)
+        if f is None:
+            return clave, None, None
+        bandas = [zlib.crc32(f[inicio:inicio + self.filas].tobytes())
+                  for inicio in range(0, self.bins, self.filas)]
+        return clave, bandas, huella(f)
+
+    def registrar(self, firma_texto, etiqueta):
+        """Como agregar, con la firma ya calculada por firmar."""
+        clave, bandas, h = firma_texto
+        original = self._exactos.get(clave)
+        if original is not None:
+            return original, 1.0
+        if bandas is not None:
+            candidatos = {}
+            for tabla, banda in zip(self._bandas, bandas):
+                for c in tabla.get(banda, ()):
+                    candidatos[c] = candidatos.get(c, 0) + 1
+            mejor = None
+            # Primero los que comparten más bandas
+            for c, _ in sorted(candidatos.items(), key=lambda cn: (-cn[1], cn[0]))[:MAX_CANDIDATOS]:
+                s = similitud(h, self._huellas[c][0], self.bins)
+                if s >= self.umbral and (mejor is None or s > mejor[1]):
+                    mejor = (self._huellas[c][1], s)
+            if mejor:
+                return mejor
+            for tabla, banda in zip(self._bandas, bandas):
+                cubeta = tabla.setdefault(banda, [])
+                if len(cubeta) < MAX_CUBETA:
+                    cubeta.append(len(self._huellas))
+            self._huellas.append((h, etiqueta))
+        self._exactos[clave] = etiqueta
+        return None
@@ -0,0 +1,107 @@
+import hashlib
+import heapq
+from array import array
+from collections import Counter
+from indice_invertido import tokenizar
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sólo acelera los percentiles
+    np = None
+
+# Palabras muy frecuentes que no sirven como "términos principales"
+STOPWORDS = {
+    "que", "los", "las", "del", "por", "con", "una", "para", "como", "mas", "sus",
+    "les", "este", "esta", "estos", "estas", "entre", "sobre", "durante", "tras",
+    "desde", "hasta", "sin", "ante", "bajo", "segun", "tambien", "pero", "porque",
+    "cuando", "donde", "muy", "son", "fue", "han", "ha", "ser", "se", "al", "el",
+    "la", "lo", "de", "en", "y", "a", "un", "su", "es", "no", "o", "e",
+}
+
+PERCENTILES = (50, 90, 99)
+
+# Ordena las tablas del resumen al hacer clic en el encabezado
+SCRIPT = """document.querySelectorAll('table.sortable').forEach(tabla => {
+  tabla.querySelectorAll('th').forEach((th, columna) => {
+    th.style.cursor = 'pointer';
+    th.addEventListener('click', () => {
+      const cuerpo = tabla.tBodies[0];
+      const filas = Array.from(cuerpo.rows);
+      const numerica = th.dataset.tipo === 'numero';
+      const asc = th.dataset.orden !== 'asc';
+      filas.sort((a, b) => {
+        const x = a.cells[columna].textContent, y = b.cells[columna].textContent;
+        const r = numerica ? parseFloat(x) - parseFloat(y) : x.localeCompare(y, 'es');
+        return asc ? r : -r;
+      });
+      th.dataset.orden = asc ? 'asc' : 'desc';
+      cuerpo.append(...filas);
+    });
+  });
+});
+"""
+SCRIPT_NAME = f"tablas.{hashlib.sha1(SCRIPT.encode('utf-8')).hexdigest()[:10]}.js"
+
+class Estadisticas:
+    """
+    Estadísticas del corpus calculadas en una sola pasada: artículos y
+    palabras por autor, totales, percentiles de longitud del texto y
+    términos más frecuentes (por cantidad de artículos que los usan).
+    """
+    def __init__(self, top: int = 20, indice=None):
+        self.top = top
+        self.por_autor = {}          # autor -> [artículos, palabras]
+        self.total_articulos = 0
+        self.total_palabras = 0
+        self.longitudes = array("L")
+        # Con un IndiceInvertido ya construido los términos salen de sus
+        # postings y no hace falta tokenizar de nuevo cada texto
+        self._indice = indice
+        self._terminos = Counter() if indice is None else None
+
+    @classmethod
+    def desde_columnas(cls, autores, textos, top: int = 20, indice=None):
+        stats = cls(top, indice)
+        for autor, texto in zip(autores, textos):
+            stats.agregar(autor, texto)
+        return stats
+
+    def agregar(self, autor: str, texto: str):
+        palabras = len(texto.split())
+        fila = self.por_autor.get(autor)
+        if fila is None:
+            self.por_autor[autor] = [1, palabras]
+        else:
+            fila[0] += 1
+            fila[1] += palabras
+        self.total_articulos += 1
+        self.total_palabras += palabras
+        self.longitudes.append(len(texto))
+        if self._terminos is not None:
+            self._terminos.update(set(tokenizar(texto)))
+
+    @property
+    def promedio_palabras(self) -> float:
+        return self.total_palabras / self.total_articulos if self.total_articulos else 0.0
+
+    def percentiles(self, ps=PERCENTILES):
+        """Percentiles de la longitud del texto (en caracteres), por rango más cercano."""
+        if not self.longitudes:
+            return {p: 0 for p in ps}
+        if np is not None:
+            valores = np.frombuffer(self.longitudes, dtype=np.dtype(self.longitudes.typecode))
+            resultado = np.percentile(valores, ps, method="inverted_cdf")
+            return {p: int(v) for p, v in zip(ps, resultado)}
+        ordenadas = sorted(self.longitudes)
+        n = len(ordenadas)
+        return {p: ordenadas[max(0, -(-p * n // 100) - 1)] for p in ps}
+
+    def top_terminos(self):
+        """[(término, artículos)] de los `top` términos más usados, sin stopwords."""
+        if self._indice is not None:
+            conteos = ((t, len(p)) for t, p in self._indice.postings.items())
+        else:
+            conteos = self._terminos.items()
+        candidatos = ((t, c) for t, c in conteos if len(t) > 2 and t not in STOPWORDS)
+        # Empates por orden alfabético: el orden de los postings depende del hash de los strings
+        return heapq.nsmallest(self.top, candidatos, key=lambda tc: (-tc[1], tc[0]))
@@ -0,0 +1,59 @@
+import re
+import unicodedata
+
+_TOKEN = re.compile(r"\w+")
+_ACENTOS = re.compile(r"[\u0300-\u036f]")
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin acentos ('Inflación' -> 'inflacion')."""
+    return _ACENTOS.sub("", unicodedata.normalize("NFKD", texto.lower()))
+
+def tokenizar(texto: str):
+    return _TOKEN.findall(normalizar(texto))
+
+class IndiceInvertido:
+    """
+    Índice token -> posiciones (ordenadas) de los textos que lo contienen.
+    Se construye una sola vez; cada consulta sólo recorre las listas de
+    posiciones de sus términos, no el corpus completo.
+    """
+    def __init__(self, textos):
+        self.postings = {}
+        for i, texto in enumerate(textos):
+            for token in set(tokenizar(texto)):
+                self.postings.setdefault(token, []).append(i)
+
+    @classmethod
+    def desde_postings(cls, postings):
+        """Índice con postings ya calculados (p. ej. combinados de varios shards)."""
+        indice = cls(())
+        indice.postings = postings
+        return indice
+
+    def buscar(self, termino: str):
+        """Posiciones de los textos que contienen todos los tokens de `termino`."""
+        return self.todos(tokenizar(termino))
+
+    def todos(self, terminos):
+        """Consulta AND: posiciones que contienen todos los términos."""
+        listas = [self.postings.get(t, []) for t in self._tokens(terminos)]
+        if not listas:
+            return []
+        listas.sort(key=len)
+        resultado = set(listas[0])
+        for lista in listas[1:]:
+            if not resultado:
+                break
+            resultado.intersection_update(lista)
+        return sorted(resultado)
+
+    def alguno(self, terminos):
+        """Consulta OR: posiciones que contienen al menos uno de los términos."""
+        resultado = set()
+        for t in self._tokens(terminos):
+            resultado.update(self.postings.get(t, ()))
+        return sorted(resultado)
+
+    @staticmethod
+    def _tokens(terminos):
+        return [t for termino in terminos for t in tokenizar(termino)]
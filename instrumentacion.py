@@ -0,0 +1,107 @@
+import contextlib
+import json
+import threading
+import time
+import tracemalloc
+
+class Medicion:
+    """
+    Tiempos por fase (spans con nombre), bytes y archivos escritos y pico de
+    memoria trazada (tracemalloc) de un build. Las fases pueden anidarse: los
+    bytes y archivos se cuentan en la fase más interna activa y en el total.
+    Con memoria=False no se usa tracemalloc, que hace más lento el build.
+    """
+    activa = True
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.fases = {}
+        self.bytes = 0
+        self.archivos = 0
+        self._pila = []
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+        self._pico = 0
+        self._propio = False
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._propio = True
+
+    @contextlib.contextmanager
+    def fase(self, nombre):
+        datos = self.fases.setdefault(nombre, {"segundos": 0.0, "llamadas": 0, "bytes": 0,
+                                               "archivos": 0, "memoria_pico": 0})
+        if self.memoria:
+            self._acumular_pico()
+            tracemalloc.reset_peak()
+        # [datos, pico visto dentro de la fase (incluidas las fases internas)]
+        actual = [datos, 0]
+        self._pila.append(actual)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            datos["segundos"] += time.perf_counter() - inicio
+            datos["llamadas"] += 1
+            self._pila.pop()
+            if self.memoria:
+                pico = max(actual[1], tracemalloc.get_traced_memory()[1])
+                datos["memoria_pico"] = max(datos["memoria_pico"], pico)
+                self._pico = max(self._pico, pico)
+                if self._pila:
+                    self._pila[-1][1] = max(self._pila[-1][1], pico)
+                tracemalloc.reset_peak()
+
+    def _acumular_pico(self):
+        """Guarda el pico hasta ahora antes de reiniciarlo para una fase nueva."""
+        pico = tracemalloc.get_traced_memory()[1]
+        self._pico = max(self._pico, pico)
+        if self._pila:
+            self._pila[-1][1] = max(self._pila[-1][1], pico)
+
+    def escrito(self, cantidad):
+        """Registra un archivo escrito de `cantidad` bytes (se puede llamar desde hilos)."""
+        with self._lock:
+            self.bytes += cantidad
+            self.archivos += 1
+            if self._pila:
+                datos = self._pila[-1][0]
+                datos["bytes"] += cantidad
+                datos["archivos"] += 1
+
+    def informe(self):
+        if self.memoria and tracemalloc.is_tracing():
+            self._acumular_pico()
+        return {
+            "segundos": time.perf_counter() - self._inicio,
+            "bytes": self.bytes,
+            "archivos": self.archivos,
+            "memoria_pico": self._pico,
+            "fases": self.fases,
+        }
+
+    def guardar(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.informe(), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    def cerrar(self):
+        """Detiene tracemalloc si lo inició esta medición."""
+        if self._propio:
+            self._acumular_pico()
+            tracemalloc.stop()
+            self._propio = False
+            self.memoria = False
+
+class SinMedicion:
+    """Medición desactivada: las fases no hacen nada (costo casi nulo)."""
+    activa = False
+    _nula = contextlib.nullcontext()
+
+    def fase(self, nombre):
+        return self._nula
+
+    def escrito(self, cantidad):
+        pass
+
+SIN_MEDICION = SinMedicion()
@@ -0,0 +1,97 @@
+import re
+
+# Elementos cuyo contenido se deja tal cual (los espacios importan o es código)
+CRUDOS = ("pre", "script", "textarea", "style")
+
+_APERTURA = re.compile(rb"<(" + "|".join(CRUDOS).encode() + rb")[\s>/]", re.IGNORECASE)
+_CIERRES = {nombre.encode(): re.compile(b"</" + nombre.encode(), re.IGNORECASE) for nombre in CRUDOS}
+# Espacios entre dos etiquetas que incluyen un salto de línea
+_ENTRE_ETIQUETAS = re.compile(rb">\s*\n\s*<")
+_COMENTARIO = re.compile(r"<!--(?!\[).*?-->", re.DOTALL)
+
+# Lo más largo que puede quedar cortado entre dos fragmentos: "<textarea" más un carácter
+_MAX_ETIQUETA = max(len(nombre) for nombre in CRUDOS) + 2
+
+def minificar(html: str) -> str:
+    """
+    Versión minificada de un texto constante (p. ej. LAYOUT): sin
+    comentarios y con los espacios reducidos como en filtrar. Se aplica
+    una sola vez.
+    """
+    return b"".join(filtrar([_COMENTARIO.sub("", html).encode("utf-8")])).decode("utf-8")
+
+def filtrar(fragmentos, ultimo=b""):
+    """
+    Filtro en streaming sobre fragmentos de bytes. Entre dos etiquetas se
+    borran los espacios que incluyen un salto de línea (la indentación de
+    las plantillas); cualquier otra secuencia de espacios queda en uno
+    solo, que se ve igual en el navegador. El contenido de <pre>, <script>,
+    <textarea> y <style> pasa sin cambios aunque las etiquetas queden
+    cortadas entre dos fragmentos. `ultimo` es el último byte ya escrito
+    antes de estos fragmentos.
+    """
+    resto, crudo = b"", None
+    for fragmento in fragmentos:
+        salida, resto, crudo, ultimo = _procesar(resto + fragmento, crudo, ultimo, False)
+        if salida:
+            yield salida
+    salida, _, _, _ = _procesar(resto, crudo, ultimo, True)
+    if salida:
+        yield salida
+
+def _colapsar(texto, ultimo):
+    """`texto` con los espacios reducidos; `ultimo` es el byte escrito antes."""
+    if ultimo == b">" and texto[:1].isspace():
+        sin_espacios = texto.lstrip()
+        if sin_espacios[:1] == b"<" and b"\n" in texto[:len(texto) - len(sin_espacios)]:
+            texto = sin_espacios
+    texto = _ENTRE_ETIQUETAS.sub(b"><", texto)
+    # split()/join() en C: es lo que hace barato el filtro sobre textos largos
+    palabras = texto.split()
+    resultado = b" ".join(palabras)
+    if texto[:1].isspace() and ultimo != b" ":
+        resultado = b" " + resultado
+    if palabras and texto[-1:].isspace():
+        resultado += b" "
+    return resultado
+
+def _procesar(datos, crudo, ultimo, final):
+    """
+    Filtra `datos` y devuelve (salida, resto sin procesar, elemento crudo
+    abierto, último byte escrito). El resto es lo que todavía no se puede
+    decidir: una etiqueta que puede estar cortada o espacios al final. Con
+    final=True no queda resto.
+    """
+    partes = []
+    pos, n = 0, len(datos)
+    while pos < n:
+        if crudo is not None:
+            cierre = _CIERRES[crudo].search(datos, pos)
+            fin = cierre.start() if cierre else (n if final else max(pos, n - _MAX_ETIQUETA))
+            if fin > pos:
+                partes.append(datos[pos:fin])
+                ultimo = datos[fin - 1:fin]
+            pos = fin
+            if cierre is None:
+                break
+            crudo = None
+            continue
+        apertura = _APERTURA.search(datos, pos)
+        fin = apertura.end() if apertura else n
+        if apertura is None and not final:
+            # Un "<pre" o "<script" puede estar cortado al final del fragmento
+            inicio = datos.rfind(b"<", max(pos, n - _MAX_ETIQUETA))
+            if inicio >= 0 and b">" not in datos[inicio:]:
+                fin = inicio
+            # Los espacios del final dependen de lo que venga después
+            fin = pos + len(datos[pos:fin].rstrip())
+        texto = _colapsar(datos[pos:fin], ultimo)
+        if texto:
+            partes.append(texto)
+            ultimo = texto[-1:]
+        pos = fin
+        if apertura is not None:
+            crudo = apertura.group(1).lower()
+        elif pos < n:
+            break
+    return b"".join(partes), datos[pos:], crudo, ultimo
@@ -58,7 +58,7 @@ class ParserHtml:
         by_author = OrderedDict()
         for art in subset:
             by_author.setdefault(art.autor, []).append(art)
-        html = f"""
+        html = [f"""
 <!DOCTYPE html>
 <html lang=\"es\">
 <head>
@@ -79,27 +79,27 @@ class ParserHtml:
   <div class=\"container my-4\">
     <nav class=\"toc d-flex flex-wrap gap-2 mb-4\">
       <h2 class=\"me-3 text-primary\">Índice de Autores</h2>
-"""
+"""]
         for autor in by_author:
             anchor = autor.lower().replace(' ', '-')
-            html += f"      <a href=\"#autor-{anchor}\" class=\"btn btn-outline-primary btn-sm\">{autor}</a>\n"
-        html += "    </nav>\n"
+            html.append(f"      <a href=\"#autor-{anchor}\" class=\"btn btn-outline-primary btn-sm\">{autor}</a>\n")
+        html.append("    </nav>\n")
         # Secciones
         for autor, arts in by_author.items():
             anchor = autor.lower().replace(' ', '-')
-            html += f"    <section id=\"autor-{anchor}\" class=\"mb-5\"> <h3 class=\"text-primary\">{autor}</h3> <div class=\"row\">\n"
+            html.append(f"    <section id=\"autor-{anchor}\" class=\"mb-5\"> <h3 class=\"text-primary\">{autor}</h3> <div class=\"row\">\n")
             for art in arts:
                 slug = f"{self._slug(art.titulo)}.html"
                 snippet = art.snippet()
-                html += f"      <a href=\"{slug}\" class=\"col-md-4 mb-4 text-decoration-none\">"
-                html += f"<div class=\"card h-100\"><div class=\"card-body d-flex flex-column\">"
-                html += f"<h5 class=\"card-title text-primary\">{art.titulo}</h5>"
-                html += f"<p class=\"card-text flex-grow-1\">{snippet}</p></div></div></a>\n"
-            html += "    </div> </section>\n"
+                html.append(f"      <a href=\"{slug}\" class=\"col-md-4 mb-4 text-decoration-none\">")
+                html.append(f"<div class=\"card h-100\"><div class=\"card-body d-flex flex-column\">")
+                html.append(f"<h5 class=\"card-title text-primary\">{art.titulo}</h5>")
+                html.append(f"<p class=\"card-text flex-grow-1\">{snippet}</p></div></div></a>\n")
+            html.append("    </div> </section>\n")
         # Footer
-        html += f"  </div> <div class=\"footer\">&copy; 2025 - Laboratorio de Programación y Lenguajes<br>Powered by ViktorDev<br>Generado: {now}</div>"
-        html += "<script src=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js\"></script></body></html>"
-        return html
+        html.append(f"  </div> <div class=\"footer\">&copy; 2025 - Laboratorio de Programación y Lenguajes<br>Powered by ViktorDev<br>Generado: {now}</div>")
+        html.append("<script src=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js\"></script></body></html>")
+        return "".join(html)
 
     def _build_article(self, art):
         now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
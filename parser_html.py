@@ -1,7 +1,68 @@
+import functools
+import hashlib
+import itertools
+import json
 import os
 import string
-from datetime import datetime
-from articulo import Articulo, InvalidArticleError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from articulo import ArticleStore, Articulo, InvalidArticleError, make_slug, make_snippet
+import busqueda
+import compresion
+from cache_render import CacheRender
+import duplicados
+import estadisticas
+import minificar
+from estadisticas import Estadisticas
+from instrumentacion import SIN_MEDICION, Medicion
+from indice_invertido import IndiceInvertido, normalizar, tokenizar
+from plantilla import Plantilla
+import recursos
+import relacionados
+
+# Estilos propios del sitio. Se publican como un archivo aparte con el hash del
+# contenido en el nombre, así el navegador lo descarga una vez y se puede servir
+# con caché de larga duración (Cache-Control: immutable). Las referencias
+# ../static/... se reescriben a los recursos publicados (ver recursos.publicar).
+STYLES = """html, body {
+  height:100%; margin:0; padding:0;
+  display:flex; flex-direction:column;
+  font-family:'Segoe UI', Tahoma, sans-serif;
+  background:#f5f5f5; color:#333;
+}
+/* Header con imagen de fondo */
+.header {
+  background-image:url('../static/foto_faro.jpg');
+  background-position:center;
+  background-size:cover;
+  background-repeat:no-repeat;
+  min-height:500px;
+  color:white;
+  display:flex; align-items:center; justify-content:center; gap:1rem;
+}
+.header img.logo { height:100px; width:100px; }
+.header h1 { margin:0; font-size:2.75rem; text-shadow:2px 2px 4px rgba(0,0,0,0.8); }
+
+/* Tarjetas */
+.card-article {
+  box-shadow:0 2px 6px rgba(0,0,0,0.1);
+  transition:transform .3s;
+}
+.card-article:hover { transform:scale(1.03); }
+
+/* Pie de página al fondo */
+.footer {
+  text-align:center; padding:1rem;
+  font-size:0.8rem; color:#999; margin-top:auto; background:#f5f5f5;
+}
+.footer .powered { margin-top:0.15rem; font-size:0.7rem; }
+.footer .date { margin-top:0.15rem; font-size:0.7rem; }
+"""
+
+def hoja_de_estilos(mapa):
+    """(nombre con hash, contenido) de STYLES con los recursos de `mapa`."""
+    contenido = recursos.reescribir(STYLES, mapa)
+    return f"estilos.{hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:10]}.css", contenido
 
 # Plantilla unificada para todas las páginas
 LAYOUT = """<!DOCTYPE html>
@@ -12,45 +73,8 @@ LAYOUT = """<!DOCTYPE html>
   <title>{title}</title>
   <!-- Favicon para todos los navegadores -->
   <link rel="icon" type="image/x-icon" href="../static/favicon.ico">
-  <link rel="icon" type="image/png" href="../static/favicon.png">
-  <link rel="apple-touch-icon" href="../static/apple-touch-icon.png">
-  <link rel="manifest" href="../static/site.webmanifest">
   <link href=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css\" rel=\"stylesheet\">
-  <style>
-    html, body {{
-      height:100%; margin:0; padding:0;
-      display:flex; flex-direction:column;
-      font-family:'Segoe UI', Tahoma, sans-serif;
-      background:#f5f5f5; color:#333;
-    }}
-    /* Header con imagen de fondo */
-    .header {{
-      background-image:url('../static/foto_faro.jpg');
-      background-position:center;
-      background-size:cover;
-      background-repeat:no-repeat;
-      min-height:500px;
-      color:white;
-      display:flex; align-items:center; justify-content:center; gap:1rem;
-    }}
-    .header img.logo {{ height:100px; width:100px; }}
-    .header h1 {{ margin:0; font-size:2.75rem; text-shadow:2px 2px 4px rgba(0,0,0,0.8); }}
-
-    /* Tarjetas */
-    .card-article {{
-      box-shadow:0 2px 6px rgba(0,0,0,0.1);
-      transition:transform .3s;
-    }}
-    .card-article:hover {{ transform:scale(1.03); }}
-
-    /* Pie de página al fondo */
-    .footer {{
-      text-align:center; padding:1rem;
-      font-size:0.8rem; color:#999; margin-top:auto; background:#f5f5f5;
-    }}
-    .footer .powered {{ margin-top:0.15rem; font-size:0.7rem; }}
-    .footer .date {{ margin-top:0.15rem; font-size:0.7rem; }}
-  </style>
+  <link rel="stylesheet" href="{stylesheet}">
 </head>
 <body>
   <div class=\"header\"><img src=\"../static/noticias_del_fuego.png\" class=\"logo\" alt=\"Noticias del Fuego\"><h1>Noticias del Fuego</h1></div>
@@ -65,204 +89,794 @@ LAYOUT = """<!DOCTYPE html>
     <div class=\"powered\">Powered by ViktorDev</div>
     <div class=\"date\">Generado el: {timestamp}</div>
   </footer>
-  <script>
-    function filterByInitial(letter) {{
-      const cards = document.querySelectorAll('.row > .col-md-4');
-      let visible = 0;
-      cards.forEach(col => {{
-        const subtitle = col.querySelector('.fst-italic').textContent.trim();
-        const surname = subtitle.split(' ').slice(-1)[0];
-        const initialChar = surname[0].toUpperCase();
-        if (!letter || initialChar === letter) {{
-          col.style.display = '';
-          visible++;
-        }} else {{
-          col.style.display = 'none';
-        }}
-      }});
-      const noRes = document.getElementById('no-results');
-      if (letter && visible === 0) noRes.style.display = '';
-      else noRes.style.display = 'none';
-    }}
-  </script>
   <script src=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js\"></script>
 </body>
 </html>"""
 
+# Recursos de static/ que usan LAYOUT y STYLES
+RECURSOS = recursos.referencias(LAYOUT, STYLES)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+ARTICLE_NAVBAR = "<nav class='navbar bg-light shadow-sm'><div class='container'><a class='navbar-brand' href='index.html'>&larr; Volver al Índice</a></div></nav>".encode('utf-8')
+
+# Incrementar al cambiar el HTML de tarjetas, resumen o artículos
+# (invalida el manifiesto de builds incrementales)
+TEMPLATE_VERSION = 2
+
+# Artículos que se renderizan y escriben por lote
+ARTICLE_BATCH = 2000
+
+# Tarjetas por página en el índice y en las páginas por inicial
+PAGE_SIZE = 60
+
+# Manifiesto con los hashes de entrada de cada página (builds incrementales)
+MANIFEST = ".manifest.json"
+
+def _hash(*partes) -> str:
+    return _hash_iter(partes)
+
+def _hash_iter(partes) -> str:
+    h = hashlib.sha1()
+    for p in partes:
+        h.update(str(p).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def plantilla_publicada(mapa, stylesheet, minify=False):
+    """
+    LAYOUT compilado una sola vez, con los recursos publicados y la hoja de
+    estilos. Con minify=True LAYOUT se minifica acá (una vez) y el contenido
+    de cada página pasa por minificar.filtrar al generarla.
+    """
+    layout = recursos.reescribir(LAYOUT, mapa)
+    if minify:
+        return Plantilla(minificar.minificar(layout), filtro=minificar.filtrar).fijar(stylesheet=stylesheet)
+    return Plantilla(layout).fijar(stylesheet=stylesheet)
+
+@functools.lru_cache(maxsize=4)
+def _plantilla_para(plantilla, timestamp):
+    """`plantilla` con el timestamp de la corrida ya fijado (una vez por proceso)."""
+    return plantilla.fijar(timestamp=timestamp)
+
+def render_page(title, navbar, content, timestamp, plantilla):
+    """
+    Genera la página como fragmentos de bytes (cabecera, contenido y pie) para
+    escribirla sin armar el documento completo en memoria. `content` es un
+    str o un iterable de fragmentos; `plantilla` es la de plantilla_publicada.
+    """
+    return _plantilla_para(plantilla, timestamp).iter_bytes(title=title, navbar=navbar, content=content)
+
+def render_article_body(datos) -> bytes:
+    """
+    Contenido de la página de un artículo (sin LAYOUT). Es una función de
+    módulo y recibe sólo datos planos para poder ejecutarse en otro proceso.
+    datos = (titulo, autor, texto, anterior, siguiente, relacionados), donde
+    anterior/siguiente son (slug, titulo) o None y relacionados es una
+    lista de (slug, titulo).
+    """
+    titulo, autor, texto, prev_art, next_art, related = datos
+
+    # Construir navegación
+    nav_links = []
+    if prev_art:
+        nav_links.append(f"<a href='{prev_art[0]}.html' class='btn btn-outline-primary'>&larr; Anterior: {prev_art[1][:30]}...</a>")
+    if next_art:
+        nav_links.append(f"<a href='{next_art[0]}.html' class='btn btn-outline-primary'>Siguiente: {next_art[1][:30]}... &rarr;</a>")
+
+    nav_html = ""
+    if nav_links:
+        nav_html = f"""
+                <div class="article-navigation mt-4 d-flex justify-content-between">
+                    {nav_links[0] if len(nav_links) > 1 else ''}
+                    {nav_links[1] if len(nav_links) > 1 else nav_links[0]}
+                </div>
+                """
+
+    related_html = ""
+    if related:
+        items = ''.join(f"<li><a href='{slug}.html'>{rel_titulo}</a></li>" for slug, rel_titulo in related)
+        related_html = f"""
+                <div class="related-articles mt-4">
+                    <h5>Artículos relacionados</h5>
+                    <ul>{items}</ul>
+                </div>
+                """
+
+    art_content = f"""
+            <h2 class='text-primary'>{titulo}</h2>
+            <p class='fst-italic'>Por {autor}</p>
+            <p>{texto}</p>
+            {nav_html}
+            {related_html}
+            """
+
+    return f"<div class='card shadow-sm'><div class='card-body'>{art_content}</div></div>".encode('utf-8')
+
+def validar_articulo(art, errors, autores=None):
+    """
+    Fila normalizada (titulo, autor, texto, fecha) del artículo, o None si no
+    sirve: los que tienen algún campo vacío se omiten y los que no pasan la
+    validación agregan el motivo a `errors`. `autores` guarda los autores ya
+    normalizados entre llamadas.
+    """
+    titulo = art.titulo.strip()
+    autor  = art.autor.strip()
+    texto  = art.texto.strip()
+    if not (titulo and autor and texto):
+        return None
+    try:
+        if len(titulo) < 10:
+            raise InvalidArticleError(f"El título debe tener al menos 10 caracteres ('{titulo}')")
+        if len(texto) < 10:
+            raise InvalidArticleError(f"El texto debe tener al menos 10 caracteres ('{texto}')")
+    except InvalidArticleError as e:
+        errors.append(str(e))
+        return None
+    autores = {} if autores is None else autores
+    autor_norm = autores.get(autor)
+    if autor_norm is None:
+        autor_norm = autores[autor] = ' '.join(p.capitalize() for p in autor.split())
+    return (titulo, autor_norm, texto, getattr(art, "fecha", None))
+
+def mensaje_duplicado(titulo, original, similitud):
+    """Error que se registra al descartar un artículo repetido."""
+    if similitud == 1.0:
+        return f"Artículo duplicado descartado ('{titulo}'): repite el texto de '{original}'"
+    return f"Artículo duplicado descartado ('{titulo}'): similitud {similitud:.2f} con '{original}'"
+
+def _a_utc(fecha):
+    """La fecha en UTC; una fecha sin zona horaria se toma como UTC."""
+    if fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc)
+
 class ParserHtml:
     """
     Genera index.html, resumen.html y páginas individuales para artículos.
     Incluye filtro por inicial del apellido (última palabra del autor).
     """
-    def __init__(self, articulos, output_dir="output"):
-        self.errors = []
-        self.articulos = self._filter_and_normalize(articulos)
+    def __init__(self, articulos, output_dir="output", errors=None, columnar=False,
+                 umbral_duplicados=duplicados.UMBRAL, medicion=None):
+        # `articulos` puede ser cualquier iterable (p. ej. cargador.cargar_articulos);
+        # se recorre una sola vez. `errors` permite compartir la lista de errores
+        # con el cargador para que todos queden en orden.
+        self.errors = errors if errors is not None else []
+        # Similitud a partir de la cual un texto se descarta por repetir uno
+        # anterior (None: sólo se descartan los textos idénticos)
+        self.umbral_duplicados = umbral_duplicados
+        # instrumentacion.Medicion para medir cada fase (ver generate_html(informe=...))
+        self.medicion = medicion or SIN_MEDICION
+        # Los artículos normalizados quedan en columnas; todo el trabajo interno
+        # usa posiciones sobre ellas. Con columnar=True `articulos` es el mismo
+        # ArticleStore y no se crea un objeto por artículo.
+        with self.medicion.fase("normalizar"):
+            self.store = ArticleStore(self._iter_normalize(articulos))
+            self.articulos = self.store if columnar else list(self.store)
         self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
+        with self.medicion.fase("indices"):
+            self._index_slugs()
+            self._index_initials()
+        self._indice = None
+        self._cache = None
+        self._relacionados = None
+        self._preparar_carpeta()
 
     def _filter_and_normalize(self, articulos):
-        resultado = []
+        return [Articulo(*fila) for fila in self._iter_normalize(articulos)]
+
+    def _iter_normalize(self, articulos):
+        """
+        Etapa generadora: valida y normaliza de a un artículo a medida que llegan.
+        Descarta los que repiten el texto de uno anterior, igual o casi igual
+        (ver duplicados.Deduplicador). Produce filas (titulo, autor, texto, fecha).
+        """
+        autores = {}
+        repetidos = duplicados.Deduplicador(self.umbral_duplicados)
         for art in articulos:
-            titulo = art.titulo.strip()
-            autor  = art.autor.strip()
-            texto  = art.texto.strip()
-            if not (titulo and autor and texto):
+            fila = validar_articulo(art, self.errors, autores)
+            if fila is None:
                 continue
-            try:
-                if len(titulo) < 10:
-                    raise InvalidArticleError(f"El título debe tener al menos 10 caracteres ('{titulo}')")
-                if len(texto) < 10:
-                    raise InvalidArticleError(f"El texto debe tener al menos 10 caracteres ('{texto}')")
-            except InvalidArticleError as e:
-                self.errors.append(str(e))
+            repetido = repetidos.agregar(fila[2], fila[0])
+            if repetido:
+                self.errors.append(mensaje_duplicado(fila[0], *repetido))
                 continue
-            autor_norm = ' '.join(p.capitalize() for p in autor.split())
-            resultado.append(Articulo(titulo, autor_norm, texto))
-        return resultado
+            yield fila
+
+    def _index_slugs(self):
+        """
+        Calcula una sola vez el slug de cada artículo y su posición en la lista.
+        Si varios títulos generan el mismo slug, el primero conserva el slug base
+        y los siguientes reciben un sufijo numérico (-2, -3, ...), de modo que
+        cada artículo tiene su propia página y su propia navegación.
+        """
+        self.slugs = []
+        self._por_slug = {}
+        usados = set()
+        for i, titulo in enumerate(self.store.titulos):
+            base = make_slug(titulo)
+            slug, n = base, 1
+            while slug in usados:
+                n += 1
+                slug = f"{base}-{n}"
+            usados.add(slug)
+            self.slugs.append(slug)
+            # Slug base -> posiciones: más de una si hay títulos repetidos
+            self._por_slug.setdefault(base, []).append(i)
+        # Posición por identidad sólo cuando hay un objeto por artículo
+        if self.articulos is self.store:
+            self._posiciones = {}
+        else:
+            self._posiciones = {id(art): i for i, art in enumerate(self.articulos)}
+
+    def _posicion(self, art):
+        """
+        Posición del artículo. Con un objeto por artículo se busca por
+        identidad; si no (columnar=True u otro objeto con los mismos datos),
+        por slug, y entre los títulos que generan el mismo slug por contenido
+        (los textos repetidos ya se descartaron al normalizar).
+        """
+        index = self._posiciones.get(id(art))
+        if index is not None:
+            return index
+        candidatas = self._por_slug.get(art.slug())
+        if not candidatas:
+            return None
+        st = self.store
+        for i in candidatas:
+            if st.textos[i] == art.texto and st.titulos[i] == art.titulo:
+                return i
+        return candidatas[0]
 
     def _get_adjacent_articles(self, current_article):
         """Devuelve el artículo anterior y siguiente en base a la lista ordenada."""
-        index = None
-        for i, art in enumerate(self.articulos):
-            if art.slug() == current_article.slug():
-                index = i
-                break
-        
+        index = self._posicion(current_article)
         if index is None:
             return None, None
-        
+
         prev_art = self.articulos[index - 1] if index > 0 else None
         next_art = self.articulos[index + 1] if index < len(self.articulos) - 1 else None
         
         return prev_art, next_art
 
+    @property
+    def indice(self):
+        """Índice invertido de los textos, construido en la primera consulta."""
+        if self._indice is None:
+            self._indice = IndiceInvertido(self.store.textos)
+        return self._indice
+
     def filter_by_keyword(self, keyword: str):
-        return [art for art in self.articulos if keyword.lower() in art.texto.lower()]
+        """
+        Artículos cuyo texto contiene la palabra (sin distinguir acentos).
+        Si `keyword` es una frase, el índice da los candidatos y se confirma
+        que la frase aparezca tal cual en el texto.
+        """
+        posiciones = self.indice.buscar(keyword)
+        if len(tokenizar(keyword)) > 1:
+            frase = normalizar(keyword)
+            posiciones = [i for i in posiciones if frase in normalizar(self.store.textos[i])]
+        return [self.articulos[i] for i in posiciones]
+
+    def filter_by_keywords(self, keywords, mode: str = "and"):
+        """Artículos que contienen todas (mode='and') o alguna (mode='or') de las palabras."""
+        if mode == "and":
+            posiciones = self.indice.todos(keywords)
+        elif mode == "or":
+            posiciones = self.indice.alguno(keywords)
+        else:
+            raise ValueError(f"Modo desconocido: '{mode}' (usar 'and' u 'or')")
+        return [self.articulos[i] for i in posiciones]
+
+    def _index_initials(self):
+        """Inicial del apellido (última palabra del autor, sin acento) -> posiciones."""
+        self._por_inicial = {}
+        iniciales = {}
+        for i, autor in enumerate(self.store.autores):
+            inicial = iniciales.get(autor)
+            if inicial is None:
+                inicial = iniciales[autor] = normalizar(autor.split()[-1][0]).upper()
+            self._por_inicial.setdefault(inicial, []).append(i)
+
+    def _initial_positions(self, initial: str):
+        return self._por_inicial.get(normalizar(initial[:1]).upper(), [])
 
     def filter_by_initial(self, initial: str):
-        return [art for art in self.articulos if art.autor.split()[-1][0].upper() == initial.upper()]
+        return [self.articulos[i] for i in self._initial_positions(initial)]
+
+    def generate_html(self, keyword: str = None, initial: str = None, incremental: bool = False,
+                      workers: int = 1, page_size: int = PAGE_SIZE, search: bool = True,
+                      compress: bool = False, deterministic: bool = False, cache_dir: str = None,
+                      related: int = 0, informe: str = None, static_dir: str = None,
+                      minify: bool = False):
+        """
+        Genera el índice (index.html, index-2.html, ... de a `page_size` tarjetas),
+        resumen.html y una página por artículo.
+        Con incremental=True sólo reescribe las páginas cuyas entradas cambiaron
+        desde la corrida anterior (según el manifiesto guardado en output_dir).
+        Las páginas de artículos eliminados se borran en ambos modos.
+        Con search=True también genera buscar.html y el índice de búsqueda
+        del navegador en busqueda/ (ver busqueda.archivos_indice).
+        Con workers > 1 las páginas de artículos se renderizan en un pool de
+        procesos y se escriben desde un pool de hilos; la salida es idéntica.
+        Los recursos de `static_dir` (por omisión STATIC_DIR) que usan LAYOUT y STYLES se publican en output_dir/static
+        con el hash del contenido en el nombre (ver recursos.publicar); si
+        falta alguno el build falla con recursos.RecursoFaltanteError.
+        Con minify=True las páginas se minifican (espacios entre etiquetas
+        reducidos, sin tocar <pre> ni <script>; ver minificar.filtrar).
+        Con compress=True deja un .gz al lado de cada página y de cada recurso
+        (ver compresion.comprimir_directorio); sin compress borra los .gz que
+        haya dejado un build anterior.
+        Con deterministic=True (o si está definida SOURCE_DATE_EPOCH) la fecha
+        del pie no depende del momento del build (ver _build_timestamp), así
+        que las mismas entradas producen exactamente los mismos bytes.
+        Con cache_dir, las tarjetas y los cuerpos de los artículos se guardan en
+        una cache persistente (cache_render.CacheRender) y se reutilizan
+        mientras no cambien el artículo ni TEMPLATE_VERSION.
+        Con related=k (p. ej. relacionados.TOP_K) cada artículo enlaza a sus k
+        artículos más parecidos según TF-IDF (ver relacionados.Relacionados);
+        por omisión no se calculan.
+        Con informe, guarda en esa ruta un JSON con el tiempo, los bytes y
+        archivos escritos y el pico de memoria de cada fase (ver
+        instrumentacion.Medicion); si el parser no se creó con una Medicion se
+        mide sólo este build.
+        Devuelve la lista de archivos escritos.
+        """
+        propia = informe and not self.medicion.activa
+        if propia:
+            self.medicion = Medicion()
+        if cache_dir:
+            self._cache = CacheRender(cache_dir)
+        try:
+            return self._generate(keyword, initial, incremental, workers, page_size,
+                                  search, compress, deterministic, related, static_dir, minify)
+        finally:
+            if self._cache:
+                self._cache.close()
+                self._cache = None
+            if informe:
+                self.medicion.guardar(informe)
+            if propia:
+                self.medicion.cerrar()
+                self.medicion = SIN_MEDICION
+
+    def _generate(self, keyword, initial, incremental, workers, page_size, search, compress, deterministic, related,
+                  static_dir, minify):
+        m = self.medicion
+        with m.fase("recursos"):
+            publicados = self._publicar_recursos(static_dir, minify)
+        anterior, vigente = self._load_manifest()
+        self._previas = anterior if incremental and vigente else {}
+        self._manifest = {}
+        self._escritos = publicados
+        timestamp = self._build_timestamp(deterministic).strftime("%d/%m/%Y %H:%M:%S")
 
-    def generate_html(self, keyword: str = None, initial: str = None):
         nav = ''
         if not keyword and initial is None:
-            nav = "<nav class='navbar navbar-light bg-light shadow-sm'><div class='container'><a class='navbar-brand' href='resumen.html'>Resumen de artículos</a></div></nav>"
+            nav = "<nav class='navbar navbar-light bg-light shadow-sm'><div class='container'><a class='navbar-brand' href='resumen.html'>Resumen de artículos</a>"
+            if search:
+                nav += "<a class='nav-link' href='buscar.html'>Buscar</a>"
+            nav += "</div></nav>"
+        nav_volver = "<nav class='navbar navbar-light bg-light shadow-sm'><div class='container'><a class='navbar-brand' href='index.html'>Volver al Índice</a></div></nav>"
+
+        # Índice paginado
+        with m.fase("indice"):
+            self._emit_paginated('index', "Noticias del Fuego", nav, self._letter_bar(),
+                                 range(len(self.store)), page_size, timestamp)
+
+        # Páginas estáticas por inicial del apellido (los botones A-Z enlazan a ellas)
+        with m.fase("iniciales"):
+            for letter in string.ascii_uppercase:
+                posiciones = self._initial_positions(letter)
+                base = f"inicial-{letter.lower()}"
+                if posiciones:
+                    self._emit_paginated(base, f"Autores con inicial {letter}", nav_volver,
+                                         self._letter_bar(letter), posiciones, page_size, timestamp)
+                else:
+                    contenido = "<div class='text-center fw-bold mt-5'>No existen artículos para esta inicial</div>"
+                    self._emit_page(f"{base}.html", f"Autores con inicial {letter}",
+                                    nav_volver, self._letter_bar(letter) + contenido, timestamp)
+
+        # Resumen
+        with m.fase("resumen"):
+            summary_html = self._build_summary()
+            self._emit_page('resumen.html', "Resumen de Artículos", nav_volver, summary_html, timestamp)
+
+        with m.fase("estaticos"):
+            self._emit_file(estadisticas.SCRIPT_NAME, estadisticas.SCRIPT)
+
+            # Hoja de estilos compartida por todas las páginas
+            self._emit_file(*self._stylesheet)
+
+        # Búsqueda en el navegador: página, script e índice por shards
+        if search:
+            with m.fase("busqueda"):
+                self._emit_page('buscar.html', "Buscar artículos", nav_volver, busqueda.CONTENIDO, timestamp)
+                self._emit_file(busqueda.SCRIPT_NAME, busqueda.SCRIPT)
+                self._preparar_carpeta(busqueda.CARPETA)
+                docs = [[slug, titulo] for slug, titulo in zip(self.slugs, self.store.titulos)]
+                for nombre, contenido in busqueda.archivos_indice(self.indice.postings, docs):
+                    self._emit_file(nombre, contenido)
 
-        # Botones A-Z para filtrar
+        with m.fase("relacionados"):
+            self._relacionados = self._related_positions(related) if related else None
+
+        # Artículos: la clave incluye a los vecinos y a los relacionados porque la página enlaza a ellos
+        with m.fase("articulos"):
+            pendientes = [i for i in range(len(self.store))
+                          if self._needs_write(f"{self.slugs[i]}.html", self._article_key(i))]
+            self._write_articles(pendientes, timestamp, workers)
+
+        with m.fase("manifiesto"):
+            # Borrar páginas de artículos que ya no existen
+            for nombre in anterior:
+                if nombre not in self._manifest:
+                    self._borrar(nombre)
+
+            self._save_manifest(self._manifest)
+
+        with m.fase("compresion"):
+            self._comprimir(compress, workers if workers > 1 else None)
+        return self._escritos
+
+    def _publicar_recursos(self, static_dir=None, minify=False):
+        """
+        Publica los recursos de static_dir y prepara la hoja de estilos y la
+        plantilla que los referencian. Devuelve los recursos escritos.
+        """
+        mapa, escritos = self._copiar_recursos(static_dir or STATIC_DIR)
+        if self.medicion.activa:
+            for ruta in escritos:
+                self.medicion.escrito(os.path.getsize(os.path.join(self.output_dir, ruta)))
+        self._stylesheet = hoja_de_estilos(mapa)
+        self._plantilla = plantilla_publicada(mapa, self._stylesheet[0], minify)
+        # Las páginas cambian si cambia algún recurso o la hoja de estilos (y con ellos su nombre)
+        # o la minificación
+        self._layout_clave = _hash(TEMPLATE_VERSION, LAYOUT, self._stylesheet[0], minify,
+                                   *(mapa[n] for n in RECURSOS))
+        return escritos
+
+    def _copiar_recursos(self, origen):
+        """Copia los recursos a output_dir/static; devuelve (mapa, escritos)."""
+        return recursos.publicar(origen, self.output_dir, RECURSOS)
+
+    def _build_timestamp(self, deterministic=False):
+        """
+        Fecha del build. SOURCE_DATE_EPOCH (segundos, UTC) tiene prioridad; en
+        modo determinista sin esa variable se usa la fecha del artículo más
+        reciente, o el epoch 0 si ningún artículo tiene fecha. Las fechas sin
+        zona horaria se toman como UTC.
+        """
+        epoch = os.environ.get('SOURCE_DATE_EPOCH')
+        if epoch:
+            return datetime.fromtimestamp(int(epoch), tz=timezone.utc)
+        if not deterministic:
+            return datetime.now()
+        fechas = [_a_utc(fecha) for fecha in self.store.fechas if fecha is not None]
+        return max(fechas) if fechas else datetime.fromtimestamp(0, tz=timezone.utc)
+
+    def _letter_bar(self, activa=None):
+        """Botones A-Z que enlazan a las páginas inicial-x.html."""
         letter_filter = ['<div class=\"letter-filter mb-4\"><h2>Filtrar por inicial del apellido</h2><div class=\"btn-group\" role=\"group\">']
         for letter in string.ascii_uppercase:
-            letter_filter.append(f"<button class='btn btn-outline-secondary' onclick=\"filterByInitial('{letter}')\">{letter}</button>")
-        letter_filter.append("<button class='btn btn-outline-secondary' onclick=\"filterByInitial(null)\">Todos</button></div></div>")
-        letter_html = '\n'.join(letter_filter)
-
-        # Placeholder para "no resultados"
-        no_results_html = "<div id='no-results' class='text-center fw-bold mt-5' style='display:none'>No existen artículos para esta inicial</div>"
-
-        # Grid de tarjetas completo
-        cards_html = self._build_cards(self.articulos)
-
-        # Generar index
-        index_content = letter_html + no_results_html + cards_html
-        page = LAYOUT.format(
-            title="Noticias del Fuego",
-            navbar=nav,
-            content=index_content,
-            year=datetime.now().year,
-            timestamp=datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        )
-        with open(os.path.join(self.output_dir, 'index.html'), 'w', encoding='utf-8') as f:
-            f.write(page)
+            clase = 'btn-secondary' if letter == activa else 'btn-outline-secondary'
+            letter_filter.append(f"<a class='btn {clase}' href='inicial-{letter.lower()}.html'>{letter}</a>")
+        letter_filter.append("<a class='btn btn-outline-secondary' href='index.html'>Todos</a></div></div>")
+        return '\n'.join(letter_filter)
+
+    @staticmethod
+    def _page_name(base, numero):
+        return f"{base}.html" if numero == 1 else f"{base}-{numero}.html"
+
+    def _pagination(self, base, numero, hay_siguiente):
+        """
+        Enlaces Anterior/Siguiente. No se muestra el total de páginas para que
+        agregar artículos al final sólo cambie la última página.
+        """
+        if numero == 1 and not hay_siguiente:
+            return ''
+        items = []
+        if numero > 1:
+            items.append(f"<li class='page-item'><a class='page-link' href='{self._page_name(base, numero - 1)}'>&laquo; Anterior</a></li>")
+        items.append(f"<li class='page-item active'><span class='page-link'>Página {numero}</span></li>")
+        if hay_siguiente:
+            items.append(f"<li class='page-item'><a class='page-link' href='{self._page_name(base, numero + 1)}'>Siguiente &raquo;</a></li>")
+        return "<nav aria-label='Paginación'><ul class='pagination justify-content-center'>" + ''.join(items) + "</ul></nav>"
+
+    def _emit_paginated(self, base, title, navbar, encabezado, posiciones, page_size, timestamp):
+        """Reparte los artículos en páginas base.html, base-2.html, ... de `page_size` tarjetas."""
+        total = len(posiciones)
+        for numero, inicio in enumerate(range(0, max(total, 1), page_size), 1):
+            fin = inicio + page_size
+            tarjetas = posiciones[inicio:fin]
+            pie = self._pagination(base, numero, fin < total)
+            titulo = title if numero == 1 else f"{title} - Página {numero}"
+            contenido = itertools.chain([encabezado], self._iter_cards(tarjetas), [pie])
+            clave = _hash(titulo, navbar, encabezado, pie, self._cards_key(tarjetas))
+            self._emit_page(self._page_name(base, numero), titulo, navbar, contenido, timestamp, clave)
+
+    def _emit_page(self, nombre, title, navbar, content, timestamp, clave=None):
+        """
+        Escribe la página en streaming si cambió. Si `content` es un iterable de
+        fragmentos hay que pasar la `clave` (hash de sus entradas).
+        """
+        if clave is None:
+            clave = _hash(title, navbar, content)
+        if self._needs_write(nombre, clave):
+            self._write(nombre, render_page(title, navbar, content, timestamp, self._plantilla))
+            self._escritos.append(nombre)
+
+    def _write_articles(self, pendientes, timestamp, workers):
+        """
+        Renderiza y escribe las páginas de los artículos `pendientes` por lotes.
+        Los cuerpos salen de la cache de render si está activa; los que faltan
+        se renderizan en un pool de procesos (workers > 1) y las escrituras van
+        a un pool de hilos.
+        """
+        m = self.medicion
+        procesos = ProcessPoolExecutor(workers) if workers > 1 else None
+        hilos = ThreadPoolExecutor(workers) if workers > 1 else None
+        escrituras = []
+        try:
+            for inicio in range(0, len(pendientes), ARTICLE_BATCH):
+                lote = pendientes[inicio:inicio + ARTICLE_BATCH]
+                with m.fase("articulos.render"):
+                    datos = [self._article_data(i) for i in lote]
+                    cuerpos = self._article_bodies(lote, datos, procesos, workers)
+                with m.fase("articulos.layout"):
+                    paginas = [b''.join(render_page(d[0], ARTICLE_NAVBAR, cuerpo, timestamp, self._plantilla))
+                               for d, cuerpo in zip(datos, cuerpos)]
+                with m.fase("articulos.escritura"):
+                    for i, pagina in zip(lote, paginas):
+                        nombre = f"{self.slugs[i]}.html"
+                        if hilos:
+                            # Los bytes se cuentan acá para atribuirlos a esta fase
+                            escrituras.append(hilos.submit(self._write, nombre, pagina, False))
+                            m.escrito(len(pagina))
+                        else:
+                            self._write(nombre, pagina)
+                        self._escritos.append(nombre)
+            with m.fase("articulos.escritura"):
+                for escritura in escrituras:
+                    escritura.result()
+        finally:
+            if procesos:
+                procesos.shutdown()
+            if hilos:
+                hilos.shutdown()
+
+    def _article_bodies(self, lote, datos, procesos, workers):
+        """Cuerpos (bytes) de las páginas del lote, en orden."""
+        if self._cache:
+            claves = [_hash('articulo', TEMPLATE_VERSION, self._article_key(i)) for i in lote]
+            guardados = self._cache.get_many(claves)
+        else:
+            claves, guardados = [None] * len(lote), {}
+        faltantes = [k for k, clave in enumerate(claves) if clave not in guardados]
+        a_renderizar = [datos[k] for k in faltantes]
+        if procesos and len(a_renderizar) > 1:
+            chunk = max(1, len(a_renderizar) // (workers * 4))
+            nuevos = procesos.map(render_article_body, a_renderizar, chunksize=chunk)
+        else:
+            nuevos = map(render_article_body, a_renderizar)
+
+        cuerpos = [guardados.get(clave) for clave in claves]
+        for k, cuerpo in zip(faltantes, nuevos):
+            cuerpos[k] = cuerpo
+        if self._cache:
+            self._cache.put_many((claves[k], cuerpos[k]) for k in faltantes)
+        return cuerpos
+
+    def _related_positions(self, k):
+        """
+        Posiciones de los k artículos relacionados con cada uno. Las listas
+        se reutilizan de la corrida anterior (estado en output_dir) sólo si
+        ningún artículo cambió, se agregó o se quitó.
+        """
+        textos = self.store.textos
+        claves = [_hash(texto) for texto in textos]
+        anterior = relacionados.cargar_estado(self.output_dir)
+        posiciones, estado = relacionados.calcular(self.slugs, claves, textos, anterior, k)
+        relacionados.guardar_estado(self.output_dir, estado)
+        return posiciones
+
+    def _article_data(self, i):
+        """Datos planos (serializables) que necesita render_article_body."""
+        st = self.store
+        prev_art = (self.slugs[i - 1], st.titulos[i - 1]) if i > 0 else None
+        next_art = (self.slugs[i + 1], st.titulos[i + 1]) if i < len(st) - 1 else None
+        related = [(self.slugs[j], st.titulos[j]) for j in self._relacionados[i]] if self._relacionados else []
+        return (st.titulos[i], st.autores[i], st.textos[i], prev_art, next_art, related)
+
+    def _article_key(self, i):
+        """Hash de todo lo que determina la página del artículo i (incluidos sus vecinos)."""
+        st = self.store
+        partes = [self.slugs[i], st.titulos[i], st.autores[i], st.textos[i]]
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(st):
+                partes += [self.slugs[j], st.titulos[j][:30]]
+            else:
+                partes += ['', '']
+        if self._relacionados:
+            for j in self._relacionados[i]:
+                partes += [self.slugs[j], st.titulos[j]]
+        return _hash(*partes)
+
+    def _emit_file(self, nombre, contenido):
+        """Escribe un archivo de texto (CSS, JS, JSON) si su contenido cambió."""
+        if self._needs_write(nombre, _hash(contenido)):
+            self._write(nombre, contenido.encode('utf-8'))
+            self._escritos.append(nombre)
+
+    def _needs_write(self, nombre, clave):
+        """Registra la clave de la página y dice si hay que (re)escribirla."""
+        self._manifest[nombre] = clave
+        if self._previas.get(nombre) != clave:
+            return True
+        return not self._existe(nombre)
+
+    # Acceso a output_dir; watch.SitioEnMemoria los redefine para no tocar el disco
+
+    def _preparar_carpeta(self, carpeta=''):
+        os.makedirs(os.path.join(self.output_dir, carpeta), exist_ok=True)
+
+    def _existe(self, nombre):
+        return os.path.exists(os.path.join(self.output_dir, nombre))
+
+    def _borrar(self, nombre):
+        # También su .gz (ver compresion.comprimir_directorio), si quedó de un build comprimido
+        for path in (os.path.join(self.output_dir, nombre), os.path.join(self.output_dir, nombre + ".gz")):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _comprimir(self, compress, hilos):
+        if compress:
+            compresion.comprimir_directorio(self.output_dir, hilos)
+        else:
+            # Los .gz de un build comprimido anterior ya no corresponden a las páginas
+            compresion.borrar_comprimidos(self.output_dir)
+
+    def _write(self, nombre, contenido, medir=True):
+        """`contenido` son bytes o un iterable de fragmentos de bytes."""
+        with open(os.path.join(self.output_dir, nombre), 'wb') as f:
+            if isinstance(contenido, bytes):
+                f.write(contenido)
+                total = len(contenido)
+            elif not (medir and self.medicion.activa):
+                f.writelines(contenido)
+            else:
+                total = 0
+                for parte in contenido:
+                    f.write(parte)
+                    total += len(parte)
+        if medir and self.medicion.activa:
+            self.medicion.escrito(total)
+
+    def _load_manifest(self):
+        """Devuelve (páginas, vigente); vigente es False si cambió la plantilla."""
+        path = os.path.join(self.output_dir, MANIFEST)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}, False
+        return data.get('paginas', {}), data.get('layout') == self._layout_clave
+
+    def _save_manifest(self, paginas):
+        path = os.path.join(self.output_dir, MANIFEST)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'layout': self._layout_clave, 'paginas': paginas}, f, ensure_ascii=False)
+
+    def _iter_cards(self, posiciones):
+        """Fragmentos del grid de tarjetas, uno por artículo."""
+        if not posiciones:
+            yield "<div class='text-center'>No hay artículos para mostrar</div>"
+            return
+        yield '<div class=\"row\">'
+        if not self._cache:
+            for i in posiciones:
+                yield self._render_card(i)
+        else:
+            st = self.store
+            claves = [_hash('tarjeta', TEMPLATE_VERSION, self.slugs[i], st.titulos[i], st.autores[i], st.textos[i])
+                      for i in posiciones]
+            guardadas = self._cache.get_many(claves)
+            nuevas = []
+            for i, clave in zip(posiciones, claves):
+                tarjeta = guardadas.get(clave)
+                if tarjeta is None:
+                    tarjeta = self._render_card(i).encode('utf-8')
+                    nuevas.append((clave, tarjeta))
+                yield tarjeta
+            self._cache.put_many(nuevas)
+        yield '\n</div>'
+
+    def _render_card(self, i):
+        st = self.store
+        return f"""
 
-        # Resumen
-        summary_html = self._build_summary()
-        summary_page = LAYOUT.format(
-            title="Resumen de Artículos",
-            navbar="<nav class='navbar navbar-light bg-light shadow-sm'><div class='container'><a class='navbar-brand' href='index.html'>Volver al Índice</a></div></nav>",
-            content=summary_html,
-            year=datetime.now().year,
-            timestamp=datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        )
-        with open(os.path.join(self.output_dir, 'resumen.html'), 'w', encoding='utf-8') as f:
-            f.write(summary_page)
-
-        # Artículos
-        for art in self.articulos:
-            prev_art, next_art = self._get_adjacent_articles(art)
-            
-            # Construir navegación
-            nav_links = []
-            if prev_art:
-                nav_links.append(f"<a href='{prev_art.slug()}.html' class='btn btn-outline-primary'>&larr; Anterior: {prev_art.titulo[:30]}...</a>")
-            if next_art:
-                nav_links.append(f"<a href='{next_art.slug()}.html' class='btn btn-outline-primary'>Siguiente: {next_art.titulo[:30]}... &rarr;</a>")
-            
-            nav_html = ""
-            if nav_links:
-                nav_html = f"""
-                <div class="article-navigation mt-4 d-flex justify-content-between">
-                    {nav_links[0] if len(nav_links) > 1 else ''}
-                    {nav_links[1] if len(nav_links) > 1 else nav_links[0]}
-                </div>
-                """
-            
-            art_content = f"""
-            <h2 class='text-primary'>{art.titulo}</h2>
-            <p class='fst-italic'>Por {art.autor}</p>
-            <p>{art.texto}</p>
-            {nav_html}
-            """
-            
-            art_page = LAYOUT.format(
-                title=art.titulo,
-                navbar="<nav class='navbar bg-light shadow-sm'><div class='container'><a class='navbar-brand' href='index.html'>&larr; Volver al Índice</a></div></nav>",
-                content=f"<div class='card shadow-sm'><div class='card-body'>{art_content}</div></div>",
-                year=datetime.now().year,
-                timestamp=datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-            )
-            
-            with open(os.path.join(self.output_dir, f"{art.slug()}.html"), 'w', encoding='utf-8') as f:
-                f.write(art_page)
-
-    def _build_cards(self, subset):
-        if not subset:
-            return "<div class='text-center'>No hay artículos para mostrar</div>"
-        html = ['<div class=\"row\">']
-        for art in subset:
-            html.append(f"""
   <div class='col-md-4 mb-4'>
-    <a href='{art.slug()}.html' class='text-decoration-none text-dark'>
+    <a href='{self.slugs[i]}.html' class='text-decoration-none text-dark'>
       <div class='card h-100 card-article'>
         <div class='card-body d-flex flex-column'>
-          <h5 class='card-title text-primary'>{art.titulo}</h5>
-          <p class='fst-italic mb-2'>Por {art.autor}</p>
-          <p class='card-text flex-grow-1'>{art.snippet()}</p>
+          <h5 class='card-title text-primary'>{st.titulos[i]}</h5>
+          <p class='fst-italic mb-2'>Por {st.autores[i]}</p>
+          <p class='card-text flex-grow-1'>{self._snippet(i)}</p>
         </div>
       </div>
     </a>
   </div>
-""")
-        html.append('</div>')
-        return '\n'.join(html)
+"""
+
+    def _snippet(self, i):
+        return make_snippet(self.store.textos[i])
+
+    def _cards_key(self, posiciones):
+        """Hash de las entradas de las tarjetas (sin renderizarlas)."""
+        st = self.store
+        return _hash_iter(x for i in posiciones
+                          for x in (self.slugs[i], st.titulos[i], st.autores[i], self._snippet(i)))
 
     def _build_summary(self):
-        counts = {}
-        for art in self.articulos:
-            counts[art.autor] = counts.get(art.autor, 0) + 1
-        if not counts:
-            return "<div class='text-center'>No se encontraron artículos para mostrar</div>"
-        html = [
+        return ''.join(self._iter_summary())
+
+    def calcular_estadisticas(self, top: int = 20):
+        """Estadísticas del corpus (una pasada sobre las columnas del store)."""
+        return Estadisticas.desde_columnas(self.store.autores, self.store.textos, top, self.indice)
+
+    def _iter_summary(self):
+        stats = self.calcular_estadisticas()
+        if not stats.total_articulos:
+            yield "<div class='text-center'>No se encontraron artículos para mostrar</div>"
+            return
+        yield "\n".join([
             "<div class='card shadow-sm mb-5'>",
             "  <div class='card-body'>",
             "    <h2 class='card-title'>Resumen de artículos por autor</h2>",
-            "    <table class='table table-bordered table-hover'>",
-            "      <thead class='table-light'><tr><th>Autor</th><th class='text-center'>Cantidad</th></tr></thead>",
+            "    <table class='table table-bordered table-hover sortable'>",
+            "      <thead class='table-light'><tr><th>Autor</th><th class='text-center' data-tipo='numero'>Cantidad</th>"
+            "<th class='text-center' data-tipo='numero'>Palabras</th><th class='text-center' data-tipo='numero'>Promedio de palabras</th></tr></thead>",
+            "      <tbody>"
+        ])
+        for autor, (c, palabras) in stats.por_autor.items():
+            yield (f"\n        <tr><td>{autor}</td><td class='text-center'>{c}</td>"
+                   f"<td class='text-center'>{palabras}</td><td class='text-center'>{palabras / c:.1f}</td></tr>")
+        yield "\n" + "\n".join([
+            "      </tbody>",
+            "    </table>",
+            "  </div>",
+            "</div>"
+        ])
+
+        percentiles = stats.percentiles()
+        generales = [
+            ("Artículos", stats.total_articulos),
+            ("Palabras", stats.total_palabras),
+            ("Promedio de palabras por artículo", f"{stats.promedio_palabras:.1f}"),
+        ] + [(f"Longitud del texto, percentil {p} (caracteres)", v) for p, v in percentiles.items()]
+        yield "\n" + "\n".join([
+            "<div class='card shadow-sm mb-5'>",
+            "  <div class='card-body'>",
+            "    <h2 class='card-title'>Totales</h2>",
+            "    <table class='table table-bordered'>",
             "      <tbody>"
-        ]
-        for autor, c in counts.items():
-            html.append(f"        <tr><td>{autor}</td><td class='text-center'>{c}</td></tr>")
-        html.extend([
+        ] + [f"        <tr><th>{nombre}</th><td class='text-center'>{valor}</td></tr>" for nombre, valor in generales] + [
             "      </tbody>",
             "    </table>",
             "  </div>",
             "</div>"
         ])
-        return '\n'.join(html)
\ No newline at end of file
+
+        yield "\n" + "\n".join([
+            "<div class='card shadow-sm mb-5'>",
+            "  <div class='card-body'>",
+            "    <h2 class='card-title'>Términos más frecuentes</h2>",
+            "    <table class='table table-bordered table-hover sortable'>",
+            "      <thead class='table-light'><tr><th>Término</th><th class='text-center' data-tipo='numero'>Artículos</th></tr></thead>",
+            "      <tbody>"
+        ] + [f"        <tr><td>{termino}</td><td class='text-center'>{c}</td></tr>" for termino, c in stats.top_terminos()] + [
+            "      </tbody>",
+            "    </table>",
+            "  </div>",
+            "</div>",
+            f"<script src='{estadisticas.SCRIPT_NAME}'></script>"
+        ])
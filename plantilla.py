@@ -0,0 +1,84 @@
+import string
+
+class Plantilla:
+    """
+    Plantilla con sintaxis de str.format compilada una sola vez a segmentos
+    de bytes UTF-8. Las partes constantes no se vuelven a parsear ni a
+    codificar: cada página se arma concatenando bytes.
+    Sólo admite campos simples ({nombre}), sin formato ni conversión.
+    `filtro` (p. ej. minificar.filtrar) se aplica en streaming a los valores
+    de los campos en iter_bytes; las partes constantes no pasan por él.
+    """
+    def __init__(self, texto: str = "", _segmentos=None, filtro=None):
+        self.filtro = filtro
+        if _segmentos is not None:
+            self.segmentos = _segmentos
+            return
+        self.segmentos = []
+        for literal, campo, spec, conversion in string.Formatter().parse(texto):
+            if literal:
+                self.segmentos.append(literal.encode("utf-8"))
+            if campo is not None:
+                if not campo or spec or conversion:
+                    raise ValueError(f"Campo no soportado en la plantilla: '{{{campo}}}'")
+                self.segmentos.append(campo)
+        self.segmentos = _fusionar(self.segmentos)
+
+    @property
+    def campos(self):
+        return [s for s in self.segmentos if isinstance(s, str)]
+
+    def fijar(self, **valores) -> "Plantilla":
+        """Nueva plantilla con esos campos ya reemplazados (p. ej. el timestamp de la corrida)."""
+        segmentos = [_a_bytes(valores[s]) if isinstance(s, str) and s in valores else s
+                     for s in self.segmentos]
+        return Plantilla(_segmentos=_fusionar(segmentos), filtro=self.filtro)
+
+    def iter_bytes(self, **valores):
+        """
+        Fragmentos de bytes de la página. Cada valor puede ser str, bytes o un
+        iterable de fragmentos (str o bytes), que se recorre en streaming.
+        """
+        if self.filtro is not None:
+            yield from self._iter_filtrado(valores)
+            return
+        for s in self.segmentos:
+            if isinstance(s, bytes):
+                yield s
+                continue
+            valor = valores[s]
+            if isinstance(valor, (str, bytes)):
+                yield _a_bytes(valor)
+            else:
+                for fragmento in valor:
+                    yield _a_bytes(fragmento)
+
+    def _iter_filtrado(self, valores):
+        ultimo = b""
+        for s in self.segmentos:
+            if isinstance(s, bytes):
+                ultimo = s
+                yield s
+                continue
+            valor = valores[s]
+            partes = (valor,) if isinstance(valor, (str, bytes)) else valor
+            # El filtro necesita el último byte escrito (p. ej. para no repetir un espacio)
+            for fragmento in self.filtro(map(_a_bytes, partes), ultimo=ultimo[-1:]):
+                ultimo = fragmento
+                yield fragmento
+
+    def render(self, **valores) -> bytes:
+        return b"".join(self.iter_bytes(**valores))
+
+def _a_bytes(valor):
+    return valor if isinstance(valor, bytes) else valor.encode("utf-8")
+
+def _fusionar(segmentos):
+    """Une los segmentos de bytes contiguos en uno solo."""
+    resultado = []
+    for s in segmentos:
+        if isinstance(s, bytes) and resultado and isinstance(resultado[-1], bytes):
+            resultado[-1] += s
+        else:
+            resultado.append(s)
+    return resultado
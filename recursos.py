@@ -0,0 +1,90 @@
+import hashlib
+import os
+import re
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin reflinks, se usan hardlinks o copias
+    fcntl = None
+
+# Carpeta (dentro de la salida) donde se publican los recursos
+CARPETA = "static"
+
+# Referencias a recursos en LAYOUT y en la hoja de estilos
+REFERENCIA = re.compile(r"\.\./static/([\w.\-]+)")
+
+# ioctl de Linux para clonar un archivo (reflink) en btrfs/XFS
+_FICLONE = 0x40049409
+
+class RecursoFaltanteError(Exception):
+    """Un recurso referenciado no existe en la carpeta de origen."""
+    pass
+
+def referencias(*textos):
+    """Nombres de los recursos referenciados como ../static/<nombre>."""
+    return sorted({nombre for texto in textos for nombre in REFERENCIA.findall(texto)})
+
+def nombre_con_hash(path, nombre):
+    """'logo.png' -> 'logo.<sha1[:10]>.png' según el contenido del archivo."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    base, ext = os.path.splitext(nombre)
+    return f"{base}.{h.hexdigest()[:10]}{ext}"
+
+def _enlazar(origen, destino):
+    """Clona (reflink), enlaza (hardlink) o, si nada de eso se puede, copia."""
+    if fcntl is not None:
+        try:
+            with open(origen, "rb") as f, open(destino, "wb") as g:
+                fcntl.ioctl(g.fileno(), _FICLONE, f.fileno())
+            return
+        except OSError:
+            if os.path.exists(destino):
+                os.remove(destino)
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+def mapa(origen, nombres):
+    """
+    {nombre: ruta publicada (static/<nombre con hash>)} de los recursos
+    `nombres` de la carpeta `origen`, sin copiar nada.
+    Lanza RecursoFaltanteError si falta alguno.
+    """
+    faltantes = [n for n in nombres if not os.path.isfile(os.path.join(origen, n))]
+    if faltantes:
+        raise RecursoFaltanteError(f"Recursos referenciados inexistentes en {origen}: {', '.join(faltantes)}")
+    return {nombre: f"{CARPETA}/{nombre_con_hash(os.path.join(origen, nombre), nombre)}" for nombre in nombres}
+
+def publicar(origen, destino, nombres):
+    """
+    Publica los recursos `nombres` de la carpeta `origen` en destino/static
+    con el hash del contenido en el nombre, así se pueden servir con caché
+    de larga duración. Borra de ahí los recursos que ya no se usan.
+    Devuelve ({nombre: ruta publicada relativa a destino}, [rutas escritas]).
+    Lanza RecursoFaltanteError si falta alguno.
+    """
+    rutas = mapa(origen, nombres)
+    carpeta = os.path.join(destino, CARPETA)
+    os.makedirs(carpeta, exist_ok=True)
+    escritos, publicados = [], set()
+    for nombre, ruta in rutas.items():
+        publicado = os.path.basename(ruta)
+        publicados.add(publicado)
+        # Mismo nombre es mismo contenido: si ya está no hay nada que hacer
+        if not os.path.exists(os.path.join(carpeta, publicado)):
+            _enlazar(os.path.join(origen, nombre), os.path.join(carpeta, publicado))
+            escritos.append(ruta)
+
+    for archivo in os.listdir(carpeta):
+        if archivo not in publicados and archivo.removesuffix(".gz") not in publicados:
+            os.remove(os.path.join(carpeta, archivo))
+    return rutas, escritos
+
+def reescribir(texto, mapa):
+    """Reemplaza cada ../static/<nombre> por su ruta publicada."""
+    return REFERENCIA.sub(lambda m: mapa[m.group(1)], texto)
@@ -0,0 +1,185 @@
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import os
+from array import array
+from collections import Counter
+from indice_invertido import tokenizar
+
+# Artículos relacionados que se muestran en cada página
+TOP_K = 5
+
+# Términos de mayor peso de cada artículo que se usan para buscar candidatos
+TERMINOS_POR_ARTICULO = 10
+
+# Términos que cada artículo aporta a las listas invertidas (su vector recortado)
+TERMINOS_VECTOR = 32
+
+# Posiciones de mayor peso que se guardan por término
+MAX_POSTINGS = 200
+
+# Entradas de las listas invertidas que recorre cada artículo en total. Es el
+# tope real del trabajo por artículo: no depende de N ni de la frecuencia de
+# sus términos.
+MAX_CANDIDATOS = 400
+
+# Cache en output_dir: {"corpus": clave_corpus(...), "listas": {slug: slugs relacionados}}
+ESTADO = ".relacionados.json"
+
+def vector(conteo, idf, df, terminos=TERMINOS_VECTOR):
+    """
+    Vector TF-IDF normalizado de un texto, recortado a sus `terminos`
+    términos de mayor peso que aparecen en más de un texto: [(peso, término)]
+    de mayor a menor. `conteo` son pares (término, frecuencia) en el orden en
+    que aparecen en el texto; `idf` sólo tiene los términos con idf > 0.
+    """
+    pesos = [((1 + math.log(tf)) * idf[t], t) for t, tf in conteo if t in idf]
+    norma = math.sqrt(sum(p * p for p, _ in pesos)) or 1.0
+    return heapq.nlargest(terminos, ((p / norma, t) for p, t in pesos if df[t] > 1))
+
+def idf_de(df, n):
+    """idf de cada término (sin los que aparecen en los n textos, que no cuentan)."""
+    return {t: math.log(n / c) for t, c in df.items() if c < n}
+
+class Relacionados:
+    """
+    Vectores TF-IDF dispersos de los textos (normalizados y recortados a sus
+    TERMINOS_VECTOR términos de mayor peso) y búsqueda aproximada de los `k`
+    más parecidos por similitud coseno.
+
+    En lugar de comparar todos los pares, cada artículo acumula puntajes sólo
+    sobre las listas invertidas de sus `terminos` términos de mayor peso,
+    ordenadas por peso, recorriendo a lo sumo `candidatos` entradas en total
+    (repartidas entre los términos, empezando por los menos frecuentes). Los
+    términos que aparecen en todos los textos tienen idf 0 y no cuentan.
+    Mientras se arma, los conteos de cada texto se guardan en arrays (con
+    los términos numerados) y no en un Counter por texto.
+    """
+    def __init__(self, textos, terminos=TERMINOS_POR_ARTICULO, max_postings=MAX_POSTINGS,
+                 candidatos=MAX_CANDIDATOS):
+        self.terminos = terminos
+        self.candidatos = candidatos
+        vocabulario = {}
+        frecuencias = array("L")
+        conteos = []
+        for texto in textos:
+            conteo = Counter(tokenizar(texto))
+            ids = array("L")
+            for t in conteo:
+                v = vocabulario.get(t)
+                if v is None:
+                    v = vocabulario[t] = len(frecuencias)
+                    frecuencias.append(0)
+                frecuencias[v] += 1
+                ids.append(v)
+            conteos.append((ids, array("L", conteo.values())))
+        palabras = list(vocabulario)
+        del vocabulario
+        df = dict(zip(palabras, frecuencias))
+        idf = idf_de(df, len(conteos))
+
+        # Por artículo sólo la consulta: [(peso, término)] de mayor peso
+        self.vectores = []
+        postings = {}
+        for i, (ids, tfs) in enumerate(conteos):
+            conteos[i] = None
+            recortado = vector(((palabras[v], tf) for v, tf in zip(ids, tfs)), idf, df)
+            self.vectores.append(tuple(recortado[:terminos]))
+            for p, t in recortado:
+                postings.setdefault(t, []).append((p, i))
+
+        # Listas invertidas ordenadas por peso y recortadas a las de mayor peso
+        self.postings = {t: heapq.nlargest(max_postings, lista) for t, lista in postings.items()}
+
+    @classmethod
+    def desde_partes(cls, vectores, postings, terminos=TERMINOS_POR_ARTICULO, max_postings=MAX_POSTINGS,
+                     candidatos=MAX_CANDIDATOS):
+        """
+        Modelo con las consultas (posición -> [(peso, término)]) y las listas
+        invertidas ya calculadas, p. ej. combinadas de varios shards.
+        """
+        modelo = cls(())
+        modelo.terminos = terminos
+        modelo.candidatos = candidatos
+        modelo.vectores = vectores
+        modelo.postings = {t: heapq.nlargest(max_postings, lista) for t, lista in postings.items()}
+        return modelo
+
+    def vecinos(self, i, k=TOP_K):
+        """[(posición, similitud)] de los k textos más parecidos al texto i."""
+        consulta = sorted(self.vectores[i], key=lambda pt: (len(self.postings[pt[1]]), pt[1]))
+        puntajes = {}
+        presupuesto = self.candidatos
+        for n, (peso, t) in enumerate(consulta):
+            lista = self.postings[t]
+            # Lo que no usa un término poco frecuente queda para los siguientes
+            cuota = min(len(lista), presupuesto // (len(consulta) - n))
+            presupuesto -= cuota
+            for p, j in itertools.islice(lista, cuota):
+                if j != i:
+                    puntajes[j] = puntajes.get(j, 0.0) + peso * p
+        # Empates: primero la posición más baja, así el resultado es estable
+        return heapq.nsmallest(k, puntajes.items(), key=lambda js: (-js[1], js[0]))
+
+def cargar_estado(carpeta):
+    try:
+        with open(os.path.join(carpeta, ESTADO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def guardar_estado(carpeta, estado):
+    with open(os.path.join(carpeta, ESTADO), "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+
+def clave_corpus(slugs, claves, k):
+    """
+    Hash de todo lo que determina las listas: los artículos (en orden), k y
+    los parámetros del modelo. Un artículo nuevo cambia el idf de todos y
+    puede ser el vecino de cualquiera, así que las listas sólo se reutilizan
+    si el corpus entero es el mismo.
+    """
+    h = hashlib.sha1(json.dumps([k, TERMINOS_POR_ARTICULO, TERMINOS_VECTOR, MAX_POSTINGS,
+                                 MAX_CANDIDATOS]).encode("utf-8"))
+    for slug, clave in zip(slugs, claves):
+        h.update(f"{slug}\0{clave}\0".encode("utf-8"))
+    return h.hexdigest()
+
+def estado_de(slugs, claves, posiciones, k):
+    """Estado a guardar con las listas calculadas (las None quedan afuera)."""
+    return {
+        "corpus": clave_corpus(slugs, claves, k),
+        "listas": {slugs[i]: [slugs[j] for j in lista] for i, lista in enumerate(posiciones) if lista is not None},
+    }
+
+def calcular(slugs, claves, textos, anterior=None, k=TOP_K, solo=None, modelo=None):
+    """
+    Lista de posiciones relacionadas de cada artículo y el estado a guardar.
+    `claves` identifica el contenido de cada artículo. Las listas de
+    `anterior` (estado de la corrida previa) se reutilizan sólo si es del
+    mismo corpus (ver clave_corpus); si no, o si falta alguna, se arma el
+    modelo y se buscan los vecinos de las que faltan.
+    Con `solo` (posiciones) se calculan sólo esos artículos; los demás
+    quedan en None y fuera del estado. `modelo` es una función que devuelve
+    el Relacionados a usar (por omisión se arma con `textos`).
+    """
+    resultado = [None] * len(slugs)
+    calculados = range(len(slugs)) if solo is None else solo
+    anterior = anterior or {}
+    if anterior.get("corpus") == clave_corpus(slugs, claves, k):
+        posicion = {slug: i for i, slug in enumerate(slugs)}
+        listas = anterior.get("listas", {})
+        for i in calculados:
+            guardada = listas.get(slugs[i])
+            if guardada is not None:
+                resultado[i] = [posicion[s] for s in guardada]
+
+    faltantes = [i for i in calculados if resultado[i] is None]
+    if faltantes:
+        modelo = modelo() if modelo else Relacionados(textos)
+        for i in faltantes:
+            resultado[i] = [j for j, _ in modelo.vecinos(i, k)]
+
+    return resultado, estado_de(slugs, claves, resultado, k)
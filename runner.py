@@ -1,4 +1,6 @@
+import sys
 from articulo import Articulo
+from cargador import cargar_articulos
 from parser_html import ParserHtml
 
 class HtmlApp:
@@ -62,10 +64,17 @@ class HtmlApp:
         ("Titular de prueba", "Autor de prueba", ""),
         ]
 
-    def run(self):
-        articulos = [Articulo(t, a, tx) for t, a, tx in  self.ejemplos_norm + self.ejemplos_reales]
-        parser = ParserHtml(articulos)
-        parser.generate_html()
+    def run(self, incremental=False, fuente=None):
+        """Con `fuente` (ruta .jsonl/.csv o '-' para stdin) lee los artículos de ahí."""
+        errores = []
+        if fuente:
+            articulos = cargar_articulos(fuente, errors=errores)
+        else:
+            articulos = [Articulo(t, a, tx) for t, a, tx in  self.ejemplos_norm + self.ejemplos_reales]
+        parser = ParserHtml(articulos, errors=errores)
+        parser.generate_html(incremental=incremental)
+        for error in parser.errors:
+            print(f"Advertencia: {error}")
 
 if __name__ == "__main__":
-    HtmlApp().run()
+    HtmlApp().run(fuente=sys.argv[1] if len(sys.argv) > 1 else None)
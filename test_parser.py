@@ -1,7 +1,32 @@
 import os
 import shutil
-from articulo import Articulo, InvalidArticleError
-from parser_html import ParserHtml
+import time
+from datetime import datetime
+from articulo import ArticleStore, Articulo, InvalidArticleError
+from parser_html import LAYOUT, ParserHtml, render_page
+from cargador import cargar_articulos
+from plantilla import Plantilla
+import busqueda
+import compresion
+import estadisticas
+import relacionados
+from cache_render import CacheRender
+from benchmarks import comparar, generar_articulos
+import gzip
+import re
+import parser_html
+import itertools
+import json
+import contextlib
+import io
+import zipfile
+import crear_zip
+import urllib.request
+import threading
+import watch
+import distribuido
+import minificar
+from recursos import RecursoFaltanteError
 
 # Test de la clase Articulo
 def test_articulo_snippet_and_slug():
@@ -60,14 +85,706 @@ def test_generate_html_creates_files():
     files = os.listdir(tmp)
     assert "index.html" in files
     assert "resumen.html" in files
-    article_pages = [f for f in files if f.endswith(".html") and f not in ("index.html", "resumen.html")]
+    assert "inicial-a.html" in files and "inicial-z.html" in files
+    stylesheet = parser._stylesheet[0]
+    assert stylesheet in files
+    with open(os.path.join(tmp, "index.html"), encoding="utf-8") as f:
+        pagina = f.read()
+    assert f'href="{stylesheet}"' in pagina and "<style>" not in pagina
+    # Recursos publicados con hash; sólo los referenciados
+    assert "../static/" not in pagina
+    publicados = sorted(os.listdir(os.path.join(tmp, "static")))
+    assert [n.split(".")[0] for n in publicados] == ["favicon", "foto_faro", "noticias_del_fuego"]
+    assert all(f"static/{n}" in pagina for n in publicados if n != publicados[1])
+    with open(os.path.join(tmp, stylesheet), encoding="utf-8") as f:
+        assert f"url('static/{publicados[1]}')" in f.read()
+    article_pages = [f for f in files if f.endswith(".html") and f not in ("index.html", "resumen.html", "buscar.html")
+                     and not f.startswith("inicial-")]
     assert len(article_pages) == 1
 
     shutil.rmtree(tmp)
 
+# Test de navegación con títulos duplicados
+def test_adjacent_articles_duplicate_titles():
+    arts = [
+        Articulo("Titulo Repetido", "Ann A", "Primer texto largo"),
+        Articulo("Otro titulo distinto", "Bob B", "Segundo texto largo"),
+        Articulo("Titulo Repetido", "Carl C", "Tercer texto largo"),
+    ]
+    tmp = "tmp_dup"
+    parser = ParserHtml(arts, output_dir=tmp)
+    assert parser.slugs == ["titulo-repetido", "otro-titulo-distinto", "titulo-repetido-2"]
+
+    # Cada duplicado tiene sus propios vecinos
+    prev_art, next_art = parser._get_adjacent_articles(parser.articulos[2])
+    assert prev_art is parser.articulos[1] and next_art is None
+
+    # Con columnar=True cada acceso crea otro objeto: se resuelve por slug y contenido
+    columnas = ParserHtml(arts, output_dir=tmp, columnar=True)
+    prev_art, next_art = columnas._get_adjacent_articles(columnas.articulos[2])
+    assert prev_art.titulo == "Otro titulo distinto" and next_art is None
+    prev_art, next_art = columnas._get_adjacent_articles(columnas.articulos[0])
+    assert prev_art is None and next_art.titulo == "Otro titulo distinto"
+
+    parser.generate_html()
+    files = os.listdir(tmp)
+    assert "titulo-repetido.html" in files and "titulo-repetido-2.html" in files
+    shutil.rmtree(tmp)
+
+# Test de escalabilidad de la navegación anterior/siguiente
+def _tiempo_build(n):
+    """Build completo (navegación, índices y páginas) sin relacionados ni búsqueda."""
+    arts = [Articulo(f"Articulo numero {i}", "Autor Prueba", f"Texto de prueba suficiente {i}") for i in range(n)]
+    inicio = time.perf_counter()
+    ParserHtml(arts, output_dir="tmp_scale").generate_html(related=0, search=False)
+    tiempo = time.perf_counter() - inicio
+    shutil.rmtree("tmp_scale")
+    return tiempo
+
+def test_adjacent_articles_scaling():
+    chico = min(_tiempo_build(1_000) for _ in range(3))
+    grande = _tiempo_build(100_000)
+    # 100 veces más artículos: lineal ~100x, cuadrático ~10000x
+    assert grande / chico < 100 * 5
+
+# Test de generación incremental con manifiesto
+def test_generate_html_incremental():
+    arts = [Articulo(f"Articulo numero {i}", "Ann A", f"Texto del articulo {i}") for i in range(5)]
+    tmp = "tmp_incr"
+    escritos = ParserHtml(arts, output_dir=tmp).generate_html(incremental=True)
+    assert len(escritos) == 3 + 7 + 26 + 2 + 5
+
+    # Sin cambios no se reescribe nada
+    assert ParserHtml(arts, output_dir=tmp).generate_html(incremental=True) == []
+
+    # Cambia el título del artículo 2: su página, la de sus vecinos y el índice
+    arts[2] = Articulo("Articulo numero 2 editado", "Ann A", "Texto del articulo 2")
+    escritos = ParserHtml(arts, output_dir=tmp).generate_html(incremental=True)
+    assert sorted(escritos) == ["articulo-numero-1.html", "articulo-numero-2-editado.html",
+                                "articulo-numero-3.html", "busqueda/docs-0.json", "index.html", "inicial-a.html"]
+    assert "articulo-numero-2.html" not in os.listdir(tmp)
+
+    # Un artículo eliminado borra su página
+    ParserHtml(arts[:4], output_dir=tmp).generate_html(incremental=True)
+    assert "articulo-numero-4.html" not in os.listdir(tmp)
+
+    # Otra hoja de estilos se llama distinto: todas las páginas apuntan a la nueva
+    estilos = parser_html.STYLES
+    parser_html.STYLES = estilos + "\nh1 { color: red; }\n"
+    try:
+        ParserHtml(arts[:4], output_dir=tmp).generate_html(incremental=True)
+    finally:
+        parser_html.STYLES = estilos
+    for nombre in os.listdir(tmp):
+        if nombre.endswith(".html"):
+            with open(os.path.join(tmp, nombre), encoding="utf-8") as f:
+                hoja = re.search(r"estilos\.\w+\.css", f.read()).group()
+            assert os.path.exists(os.path.join(tmp, hoja)), nombre
+    shutil.rmtree(tmp)
+
+# Test de generación en paralelo: misma salida que la serial
+def _leer_salida(carpeta):
+    salida = {}
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in archivos:
+            path = os.path.join(raiz, nombre)
+            with open(path, "rb") as f:
+                salida[os.path.relpath(path, carpeta)] = f.read()
+    return salida
+
+def test_generate_html_parallel_matches_serial():
+    arts = [Articulo(f"Articulo numero {i}", f"Autor {i % 7}", f"Texto del articulo {i} " * 5) for i in range(40)]
+    ParserHtml(arts, output_dir="tmp_serial").generate_html(deterministic=True)
+    ParserHtml(arts, output_dir="tmp_parallel").generate_html(workers=4, deterministic=True)
+    assert _leer_salida("tmp_serial") == _leer_salida("tmp_parallel")
+    shutil.rmtree("tmp_serial")
+    shutil.rmtree("tmp_parallel")
+
+# Test de carga en streaming desde JSONL y CSV
+def test_cargar_articulos_jsonl_y_csv():
+    tmp = "tmp_carga"
+    os.makedirs(tmp, exist_ok=True)
+    jsonl = os.path.join(tmp, "articulos.jsonl")
+    with open(jsonl, "w", encoding="utf-8") as f:
+        f.write('{"titulo": "Titulo valido uno", "autor": "ana lópez", "texto": "Texto suficiente", "fecha": "2025-05-01"}\n')
+        f.write('{esto no es json\n')
+        f.write('{"titulo": "Corto", "autor": "Bob B", "texto": "Texto suficiente"}\n')
+    csv_path = os.path.join(tmp, "articulos.csv")
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write('titulo,autor,texto\n"Titulo valido dos","carl c","Texto, con coma"\n')
+
+    errores = []
+    parser = ParserHtml(cargar_articulos(jsonl, errors=errores), output_dir=tmp, errors=errores)
+    assert [a.autor for a in parser.articulos] == ["Ana López"]
+    assert parser.articulos[0].fecha == datetime(2025, 5, 1)
+    assert len(parser.errors) == 2 and parser.errors[0].startswith("Línea 2")
+
+    arts = list(cargar_articulos(csv_path))
+    assert arts[0].titulo == "Titulo valido dos" and arts[0].texto == "Texto, con coma"
+    shutil.rmtree(tmp)
+
+# Test del índice invertido: consultas simples, AND, OR y sin acentos
+def test_keyword_index_queries():
+    arts = [
+        Articulo("Articulo uno largo", "Ann A", "La inflación golpea a Ushuaia este invierno"),
+        Articulo("Articulo dos largo", "Bob B", "El turismo crece en Ushuaia y Tolhuin"),
+        Articulo("Articulo tres largo", "Carl C", "Nueva inflacion en Río Grande"),
+    ]
+    tmp = "tmp_index"
+    parser = ParserHtml(arts, output_dir=tmp)
+
+    # Palabras completas: mismo resultado que el filtro por subcadena
+    for palabra in ("Ushuaia", "turismo", "golpea"):
+        esperado = [a for a in parser.articulos if palabra.lower() in a.texto.lower()]
+        assert parser.filter_by_keyword(palabra) == esperado
+
+    assert len(parser.filter_by_keyword("inflacion")) == 2
+    assert parser.filter_by_keyword("rio grande") == [parser.articulos[2]]
+    assert parser.filter_by_keywords(["ushuaia", "inflación"]) == [parser.articulos[0]]
+    assert parser.filter_by_keywords(["turismo", "grande"], mode="or") == parser.articulos[1:]
+    shutil.rmtree(tmp)
+
+# Test de páginas estáticas por inicial
+def test_initial_pages():
+    arts = [
+        Articulo("Articulo uno largo", "ana álvarez", "Texto suficiente uno"),
+        Articulo("Articulo dos largo", "bob brown", "Texto suficiente dos"),
+    ]
+    tmp = "tmp_initial"
+    parser = ParserHtml(arts, output_dir=tmp)
+    assert [a.autor for a in parser.filter_by_initial("a")] == ["Ana Álvarez"]
+    parser.generate_html()
+
+    with open(os.path.join(tmp, "inicial-a.html"), encoding="utf-8") as f:
+        pagina = f.read()
+    assert "articulo-uno-largo.html" in pagina and "articulo-dos-largo.html" not in pagina
+    with open(os.path.join(tmp, "inicial-c.html"), encoding="utf-8") as f:
+        assert "No existen artículos para esta inicial" in f.read()
+    with open(os.path.join(tmp, "index.html"), encoding="utf-8") as f:
+        assert "href='inicial-b.html'" in f.read()
+    shutil.rmtree(tmp)
+
+# Test del índice paginado
+def test_paginated_index():
+    arts = [Articulo(f"Articulo numero {i}", "Ann A", f"Texto del articulo {i}") for i in range(5)]
+    tmp = "tmp_pages"
+    ParserHtml(arts, output_dir=tmp).generate_html(page_size=2, incremental=True)
+    files = os.listdir(tmp)
+    assert {"index.html", "index-2.html", "index-3.html"} <= set(files)
+    assert "index-4.html" not in files
+    with open(os.path.join(tmp, "index-2.html"), encoding="utf-8") as f:
+        pagina = f.read()
+    assert "articulo-numero-2.html" in pagina and "articulo-numero-4.html" not in pagina
+    assert "href='index.html'>&laquo; Anterior" in pagina and "href='index-3.html'" in pagina
+
+    # Agregar artículos al final sólo reescribe las páginas del final
+    arts.append(Articulo("Articulo numero 5", "Ann A", "Texto del articulo 5"))
+    escritos = ParserHtml(arts, output_dir=tmp).generate_html(page_size=2, incremental=True)
+    assert "index.html" not in escritos and "index-2.html" not in escritos
+    assert "index-3.html" in escritos
+    shutil.rmtree(tmp)
+
+# Test de la plantilla compilada en streaming: mismos bytes que LAYOUT.format
+def test_render_page_streaming():
+    fragmentos = (f"<p>{i}</p>" for i in range(3))
+    plantilla = Plantilla(LAYOUT).fijar(stylesheet="estilos.css")
+    pagina = b"".join(render_page("Título", "<nav></nav>", fragmentos, "01/01/2025 00:00:00", plantilla))
+    assert pagina == LAYOUT.format(title="Título", navbar="<nav></nav>",
+                                   content="<p>0</p><p>1</p><p>2</p>", stylesheet="estilos.css",
+                                   timestamp="01/01/2025 00:00:00").encode("utf-8")
+
+# Test de Plantilla: campos fijados una vez por corrida
+def test_plantilla_fijar():
+    plantilla = Plantilla("<h1>{title}</h1>{{x}}<p>{timestamp}</p>")
+    assert plantilla.campos == ["title", "timestamp"]
+    fija = plantilla.fijar(timestamp="hoy")
+    assert fija.campos == ["title"]
+    assert fija.render(title="Año") == "<h1>Año</h1>{x}<p>hoy</p>".encode("utf-8")
+
+# Test del índice de búsqueda por shards
+def test_search_index_shards():
+    postings = {"ushuaia": list(range(30)), "uno": [1, 5], "turismo": [2, 3, 40], "tolhuin": [7]}
+    grupos = busqueda.agrupar_por_prefijo(postings, max_postings=10)
+    # Ningún shard supera el límite salvo un token que lo supera por sí solo
+    for prefijo, tokens in grupos.items():
+        total = sum(len(postings[t]) for t in tokens)
+        assert total <= 10 or len(tokens) == 1
+    assert sorted(t for tokens in grupos.values() for t in tokens) == sorted(postings)
+
+    # Un token que supera el límite por sí solo se parte en varios archivos acotados
+    archivos = dict(busqueda.archivos_indice(postings, [], max_postings=10))
+    manifest = json.loads(archivos[f"{busqueda.CARPETA}/manifest.json"])
+    numero, inicios = manifest["partes"]["ushuaia"]
+    assert inicios == [0, 10, 20] and "ushuaia" not in json.dumps(manifest["shards"])
+    reunidas = []
+    for k in range(len(inicios)):
+        saltos = json.loads(archivos[f"{busqueda.CARPETA}/s{numero}-{k}.json"])["ushuaia"]
+        assert len(saltos) <= 10
+        reunidas += list(itertools.accumulate(saltos))
+    assert reunidas == postings["ushuaia"]
+    for nombre, contenido in archivos.items():
+        if nombre.endswith(".json") and "manifest" not in nombre:
+            assert sum(len(ps) for ps in json.loads(contenido).values()) <= 10
+
+    arts = [Articulo(f"Articulo numero {i}", "Ann A", f"Turismo en Ushuaia número {i}") for i in range(3)]
+    tmp = "tmp_search"
+    ParserHtml(arts, output_dir=tmp).generate_html()
+    carpeta = os.path.join(tmp, busqueda.CARPETA)
+    with open(os.path.join(carpeta, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    with open(os.path.join(carpeta, f"s{manifest['shards']['']}.json"), encoding="utf-8") as f:
+        assert json.load(f)["numero"] == [0, 1, 1]
+    with open(os.path.join(carpeta, "docs-0.json"), encoding="utf-8") as f:
+        assert json.load(f)[2] == ["articulo-numero-2", "Articulo numero 2"]
+    assert "buscar.html" in os.listdir(tmp)
+    shutil.rmtree(tmp)
+
+# Test de los .gz generados al lado de páginas y assets
+def test_generate_html_compress():
+    tmp = "tmp_gz"
+    salida = os.path.join(tmp, "output")
+    static = os.path.join(tmp, "static")
+    os.makedirs(static)
+    for nombre in ("favicon.ico", "foto_faro.jpg", "noticias_del_fuego.png"):
+        with open(os.path.join(static, nombre), "wb") as f:
+            f.write(nombre.encode() * 10)
+
+    arts = [Articulo("Articulo numero uno", "Ann A", "Texto suficiente del articulo")]
+    ParserHtml(arts, output_dir=salida).generate_html(compress=True, static_dir=static)
+    with open(os.path.join(salida, "index.html"), "rb") as f, gzip.open(os.path.join(salida, "index.html.gz")) as g:
+        assert f.read() == g.read()
+    publicados = os.listdir(os.path.join(salida, "static"))
+    assert any(n.startswith("favicon.") and n.endswith(".ico.gz") for n in publicados)
+    assert not any(n.endswith((".jpg.gz", ".png.gz")) for n in publicados)
+
+    # Sin cambios no se recomprime nada
+    assert compresion.comprimir_directorio(salida) == []
+
+    # La página de un artículo eliminado se borra con su .gz
+    slug = ParserHtml(arts, output_dir=salida).slugs[0]
+    ParserHtml(arts, output_dir=salida).generate_html(compress=True, static_dir=static)
+    otro = [Articulo("Articulo numero dos", "Ann A", "Otro texto suficiente del articulo")]
+    ParserHtml(otro, output_dir=salida).generate_html(compress=True, static_dir=static)
+    assert f"{slug}.html.gz" not in os.listdir(salida)
+
+    # Un build sin compress no deja .gz viejos
+    ParserHtml(arts, output_dir=salida).generate_html(static_dir=static)
+    assert not [n for raiz, _, nombres in os.walk(salida) for n in nombres if n.endswith(".gz")]
+    assert compresion.ESTADO not in os.listdir(salida)
+    shutil.rmtree(tmp)
+
+# Test de build reproducible: dos builds de las mismas entradas son idénticos
+def test_generate_html_reproducible():
+    arts = [
+        Articulo("Articulo numero uno", "Ann A", "Texto suficiente uno", datetime(2025, 5, 1, 10, 30)),
+        Articulo("Articulo numero dos", "Bob B", "Texto suficiente dos", datetime(2025, 5, 3, 8, 0)),
+    ]
+    ParserHtml(arts, output_dir="tmp_build1").generate_html(deterministic=True)
+    time.sleep(1.1)
+    ParserHtml(arts, output_dir="tmp_build2").generate_html(deterministic=True)
+    primero, segundo = _leer_salida("tmp_build1"), _leer_salida("tmp_build2")
+    assert primero == segundo
+    assert "Generado el: 03/05/2025 08:00:00" in primero["index.html"].decode("utf-8")
+    shutil.rmtree("tmp_build1")
+    shutil.rmtree("tmp_build2")
+
+    # Fechas con y sin zona horaria en la misma fuente (se comparan en UTC)
+    lineas = [json.dumps({"titulo": "Articulo numero uno", "autor": "Ann A", "texto": "Texto suficiente uno",
+                          "fecha": "2025-05-01"}),
+              json.dumps({"titulo": "Articulo numero dos", "autor": "Bob B", "texto": "Texto suficiente dos",
+                          "fecha": "2025-05-01T10:00:00-03:00"})]
+    os.makedirs("tmp_build1")
+    fuente = os.path.join("tmp_build1", "articulos.jsonl")
+    with open(fuente, "w", encoding="utf-8") as f:
+        f.write("\n".join(lineas))
+    parser = ParserHtml(cargar_articulos(fuente), output_dir="tmp_build1")
+    assert parser._build_timestamp(deterministic=True).strftime("%d/%m/%Y %H:%M:%S") == "01/05/2025 13:00:00"
+    shutil.rmtree("tmp_build1")
+
+    # Cualquier objeto con titulo, autor y texto sigue sirviendo (sin fecha)
+    class Simple:
+        def __init__(self, titulo, autor, texto):
+            self.titulo, self.autor, self.texto = titulo, autor, texto
+    parser = ParserHtml([Simple("Articulo sin fecha", "Ann A", "Texto suficiente")], output_dir="tmp_build1")
+    assert parser.store.fechas == [None]
+    shutil.rmtree("tmp_build1")
+
+# Test de la cache de render persistente
+def test_render_cache():
+    arts = [Articulo(f"Articulo numero {i}", "Ann A", f"Texto del articulo {i}") for i in range(5)]
+    cache_dir = os.path.join("tmp_cache", "cache")
+    ParserHtml(arts, output_dir="tmp_cache/a").generate_html(deterministic=True, cache_dir=cache_dir)
+    ParserHtml(arts, output_dir="tmp_cache/b").generate_html(deterministic=True, cache_dir=cache_dir)
+    assert _leer_salida("tmp_cache/a") == _leer_salida("tmp_cache/b")
+
+    cache = CacheRender(cache_dir)
+    assert len(cache.get_many([f"no-existe-{i}" for i in range(3)])) == 0
+    cache.close()
+    shutil.rmtree("tmp_cache")
+
+def test_render_cache_lru_eviction():
+    tmp = "tmp_lru"
+    cache = CacheRender(tmp, max_bytes=25)
+    cache.put_many([("a", b"x" * 10), ("b", b"x" * 10)])
+    cache.get_many(["a"])                  # "b" pasa a ser el menos usado
+    cache.put_many([("c", b"x" * 10)])
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+    cache.close()
+    shutil.rmtree(tmp)
+
+# Test de almacenamiento por columnas: misma salida sin un objeto por artículo
+def test_columnar_store():
+    assert not hasattr(Articulo("Titulo valido", "Ann A", "Texto valido"), "__dict__")
+    arts = [Articulo(f"Articulo numero {i}", f"autor {i % 3}", f"Texto del articulo {i}") for i in range(9)]
+    objetos = ParserHtml(arts, output_dir="tmp_obj")
+    columnas = ParserHtml(arts, output_dir="tmp_col", columnar=True)
+    assert isinstance(columnas.articulos, ArticleStore)
+    assert columnas.store.autores[0] is columnas.store.autores[3]
+    assert [a.titulo for a in columnas.filter_by_initial("0")] == [a.titulo for a in objetos.filter_by_initial("0")]
+    assert columnas._build_summary() == objetos._build_summary()
+
+    objetos.generate_html(deterministic=True)
+    columnas.generate_html(deterministic=True)
+    assert _leer_salida("tmp_obj") == _leer_salida("tmp_col")
+    shutil.rmtree("tmp_obj")
+    shutil.rmtree("tmp_col")
+
+def test_estadisticas():
+    arts = [
+        Articulo("Puerto nuevo", "Ann A", "El puerto de Ushuaia recibe cruceros"),
+        Articulo("Faro del fin del mundo", "Ann A", "El faro y el puerto"),
+        Articulo("Ruta tres sur", "Bob B", "La ruta cerca del puerto"),
+    ]
+    parser = ParserHtml(arts, output_dir="tmp_stats")
+    stats = parser.calcular_estadisticas(top=2)
+    assert stats.total_articulos == 3
+    assert stats.por_autor == {"Ann A": [2, 11], "Bob B": [1, 5]}
+    assert stats.promedio_palabras == 16 / 3
+    assert stats.percentiles((50, 100)) == {50: 24, 100: 36}
+    # "puerto" está en los tres artículos; "del" y "el" son stopwords
+    assert stats.top_terminos()[0] == ("puerto", 3)
+    assert all(t not in estadisticas.STOPWORDS for t, _ in stats.top_terminos())
+
+    resumen = parser._build_summary()
+    assert "class='table table-bordered table-hover sortable'" in resumen
+    assert estadisticas.SCRIPT_NAME in resumen
+    shutil.rmtree("tmp_stats")
+
+def test_related_articles():
+    textos = [
+        "El faro del fin del mundo guia barcos en el canal",
+        "Restauran el faro y la linterna del canal",
+        "Turistas visitan el faro en barcos por el canal",
+        "La ruta tres cortada por nieve en el paso",
+        "Reabren la ruta tres tras la nieve",
+        "Camiones varados en la ruta por nieve",
+    ]
+    arts = [Articulo(f"Articulo numero {i}", "Ann A", t) for i, t in enumerate(textos)]
+    tmp = "tmp_rel"
+    ParserHtml(arts, output_dir=tmp).generate_html(related=2, search=False)
+    with open(os.path.join(tmp, "articulo-numero-0.html"), encoding="utf-8") as f:
+        pagina = f.read()
+    assert "Artículos relacionados" in pagina
+    assert "articulo-numero-2.html" in pagina and "articulo-numero-4.html" not in pagina
+
+    # Sin cambios se reutiliza el estado guardado y no se recalculan los vectores
+    slugs = [f"articulo-numero-{i}" for i in range(6)]
+    claves = [str(i) for i in range(6)]
+    posiciones, estado = relacionados.calcular(slugs, claves, textos, k=2)
+    assert set(posiciones[3]) == {4, 5}
+    assert relacionados.calcular(slugs, claves, None, estado, k=2)[0] == posiciones
+
+    # Un artículo nuevo invalida las listas guardadas: igual que un build desde cero
+    copia = arts + [Articulo("Articulo numero 6", "Ann A", textos[0] + " austral")]
+    fresco = "tmp_rel_fresco"
+    ParserHtml(arts[:5], output_dir=tmp).generate_html(related=2, search=False, deterministic=True)
+    ParserHtml(copia, output_dir=tmp).generate_html(related=2, search=False, deterministic=True)
+    ParserHtml(copia, output_dir=fresco).generate_html(related=2, search=False, deterministic=True)
+    for nombre in os.listdir(fresco):
+        if nombre.endswith(".html"):
+            with open(os.path.join(tmp, nombre), "rb") as a, open(os.path.join(fresco, nombre), "rb") as b:
+                assert a.read() == b.read(), nombre
+    shutil.rmtree(fresco)
+
+    # Cada artículo recorre a lo sumo `candidatos` entradas de las listas invertidas
+    modelo = relacionados.Relacionados(textos, candidatos=2)
+    assert all(len(modelo.vecinos(i, 5)) <= 2 for i in range(len(textos)))
+
+    # Por omisión no se calculan
+    ParserHtml(arts, output_dir=tmp).generate_html(search=False)
+    with open(os.path.join(tmp, "articulo-numero-0.html"), encoding="utf-8") as f:
+        assert "Artículos relacionados" not in f.read()
+    shutil.rmtree(tmp)
+
+def test_duplicate_articles():
+    texto = ("El municipio de Ushuaia anunció hoy la apertura de la temporada de cruceros "
+             "con la llegada de diez barcos al puerto durante el fin de semana largo")
+    arts = [
+        Articulo("Llegan los cruceros", "Ann A", texto),
+        Articulo("Llegan los cruceros (copia)", "Bob B", "  " + texto.upper()),
+        Articulo("Llegan los cruceros editado", "Ann A", texto + " según informaron"),
+        Articulo("Nieve en la ruta tres", "Carl C",
+                 "Vialidad cortó la ruta tres en el paso Garibaldi por la nieve que cayó durante toda la noche"),
+    ]
+    tmp = "tmp_dedup"
+    parser = ParserHtml(arts, output_dir=tmp)
+    assert [a.titulo for a in parser.articulos] == ["Llegan los cruceros", "Nieve en la ruta tres"]
+    assert len(parser.errors) == 2
+    assert "repite el texto de 'Llegan los cruceros'" in parser.errors[0]
+    assert "similitud" in parser.errors[1]
+
+    # Sin umbral sólo se descartan los textos idénticos
+    parser = ParserHtml(arts, output_dir=tmp, umbral_duplicados=None)
+    assert len(parser.articulos) == 3 and len(parser.errors) == 1
+    shutil.rmtree(tmp)
+
+def test_benchmarks_corpus_y_comparacion():
+    primeros = [(a.titulo, a.autor, a.texto) for a in generar_articulos(20)]
+    assert [(a.titulo, a.autor, a.texto) for a in generar_articulos(50)][:20] == primeros
+    parser = ParserHtml(generar_articulos(200), output_dir="tmp_bench")
+    assert len(parser.articulos) == 200 and not parser.errors
+
+    base = {"tamanos": {"1000": {"normalizar": 1.0, "zip": 0.01}}}
+    actual = {"tamanos": {"1000": {"normalizar": 1.5, "zip": 0.04}, "10000": {"normalizar": 9.0}}}
+    # zip está por debajo del mínimo medible y 10000 no está en la base
+    assert comparar(base, actual, umbral=0.25) == [("1000", "normalizar", 1.0, 1.5)]
+    assert comparar(base, actual, umbral=0.6) == []
+    shutil.rmtree("tmp_bench")
+
+def test_generate_html_informe():
+    arts = [Articulo(f"Articulo numero {i}", f"autor {i % 3}", f"Texto del articulo {i}") for i in range(5)]
+    tmp = "tmp_informe"
+    informe = os.path.join(tmp, "informe.json")
+    parser = ParserHtml(arts, output_dir=tmp)
+    escritos = parser.generate_html(workers=2, informe=informe)
+    with open(informe, encoding="utf-8") as f:
+        datos = json.load(f)
+    assert {"indice", "resumen", "articulos.render", "articulos.escritura"} <= set(datos["fases"])
+    assert datos["archivos"] == len(escritos)
+    assert datos["bytes"] == sum(os.path.getsize(os.path.join(tmp, n)) for n in escritos)
+    assert datos["fases"]["articulos.escritura"]["archivos"] == 5
+    assert datos["memoria_pico"] > 0
+    # La medición era sólo de ese build: el siguiente sin informe no mide nada
+    assert not parser.medicion.activa
+    shutil.rmtree(tmp)
+
+def test_crear_zip_incremental():
+    tmp = os.path.abspath("tmp_zip")
+    os.makedirs(os.path.join(tmp, "output"))
+    os.makedirs(os.path.join(tmp, "static"))
+    for i in range(3):
+        with open(os.path.join(tmp, "output", f"p{i}.html"), "w") as f:
+            f.write(f"<p>pagina {i}</p>" * 50)
+    with open(os.path.join(tmp, "output", "año-ñandú.html"), "w", encoding="utf-8") as f:
+        f.write("<p>señal</p>" * 50)
+    # Lo oculto y los __pycache__ no se empaquetan
+    for oculto in (".manifest.json", os.path.join(".shards", "s0.json"), os.path.join("__pycache__", "x.pyc")):
+        os.makedirs(os.path.dirname(os.path.join(tmp, "output", oculto)), exist_ok=True)
+        with open(os.path.join(tmp, "output", oculto), "w") as f:
+            f.write("{}")
+    with open(os.path.join(tmp, "static", "logo.png"), "wb") as f:
+        f.write(b"\x89PNG" + bytes(range(256)))
+    anterior = os.getcwd()
+    os.chdir(tmp)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            crear_zip.crear_zip_proyecto()
+        time.sleep(0.01)
+        with open(os.path.join("output", "p1.html"), "a") as f:
+            f.write("editada")
+        os.remove(os.path.join("output", "p2.html"))
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            nombre = crear_zip.crear_zip_proyecto(incremental=True)
+        assert "1 comprimidas, 0 guardadas sin comprimir, 3 reutilizadas" in salida.getvalue()
+        with zipfile.ZipFile(nombre) as z:
+            assert z.testzip() is None
+            assert sorted(z.namelist()) == ["output/año-ñandú.html", "output/p0.html",
+                                            "output/p1.html", "static/logo.png"]
+            assert z.read("output/año-ñandú.html").decode("utf-8").startswith("<p>señal</p>")
+            assert z.read("output/p1.html").endswith(b"editada")
+            assert z.getinfo("static/logo.png").compress_type == zipfile.ZIP_STORED
+            assert z.getinfo("output/p0.html").compress_type == zipfile.ZIP_DEFLATED
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(tmp)
+
+def test_missing_asset_fails_build():
+    tmp = "tmp_assets"
+    os.makedirs(os.path.join(tmp, "fuente"))
+    with open(os.path.join(tmp, "fuente", "favicon.ico"), "wb") as f:
+        f.write(b"ico")
+    parser = ParserHtml([Articulo("Articulo numero uno", "Ann A", "Texto suficiente")], output_dir=tmp)
+    try:
+        parser.generate_html(static_dir=os.path.join(tmp, "fuente"))
+        assert False, "falta foto_faro.jpg"
+    except RecursoFaltanteError as e:
+        assert "foto_faro.jpg" in str(e) and "noticias_del_fuego.png" in str(e)
+    shutil.rmtree(tmp)
+
+def test_watch_en_memoria():
+    tmp = "tmp_watch"
+    os.makedirs(tmp)
+    fuente = os.path.join(tmp, "articulos.jsonl")
+    def escribir(textos):
+        with open(fuente, "w", encoding="utf-8") as f:
+            for i, texto in enumerate(textos):
+                f.write(json.dumps({"titulo": f"Titulo del articulo {i}", "autor": "Ana Paz", "texto": texto}) + "\n")
+    escribir([f"Texto original numero {i}" for i in range(3)])
+    servidor = watch.Servidor(fuente, puerto=0)
+    threading.Thread(target=servidor.http.serve_forever, daemon=True).start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert servidor.revisar()
+            assert not servidor.revisar()
+        slug = servidor.sitio.slugs[1]
+        pagina = urllib.request.urlopen(servidor.url + slug + ".html").read()
+        assert b"Texto original numero 1" in pagina
+        assert urllib.request.urlopen(servidor.url).read() == servidor.sitio.pagina("index.html")
+        primera = servidor.sitio.pagina(f"{servidor.sitio.slugs[0]}.html")
+
+        time.sleep(0.01)
+        escribir(["Texto original numero 0", "Texto editado", "Texto original numero 2"])
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            assert servidor.revisar()
+        # Cambian el artículo y las páginas que lo muestran (índice, inicial, búsqueda, ...)
+        assert "3 artículos" in salida.getvalue()
+        assert b"Texto editado" in urllib.request.urlopen(servidor.url + slug + ".html").read()
+        # Las páginas que no cambiaron no se vuelven a renderizar
+        assert servidor.sitio.paginas[f"{servidor.sitio.slugs[0]}.html"] is primera
+        # Nada se escribe en disco
+        assert os.listdir(tmp) == ["articulos.jsonl"]
+
+        # Pedidos simultáneos de una página sin renderizar reciben los mismos bytes
+        time.sleep(0.01)
+        escribir(["Texto original numero 0", "Texto editado otra vez", "Texto original numero 2"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert servidor.revisar()
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(servidor.sitio.pagina("index.html")))
+                 for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        assert len(set(resultados)) == 1 and resultados[0]
+
+        # Un error inesperado en el build no corta el servidor: sigue la versión anterior
+        sitio = servidor.sitio
+        original, watch.cargar_articulos = watch.cargar_articulos, lambda *a, **k: 1 / 0
+        try:
+            salida = io.StringIO()
+            with contextlib.redirect_stdout(salida):
+                servidor.construir()
+        finally:
+            watch.cargar_articulos = original
+        assert "ZeroDivisionError" in salida.getvalue()
+        assert servidor.sitio is sitio
+    finally:
+        servidor.http.shutdown()
+        servidor.http.server_close()
+        shutil.rmtree(tmp)
+
+def test_build_distribuido_igual_a_un_nodo():
+    tmp = "tmp_distribuido"
+    os.makedirs(tmp)
+    fuente = os.path.join(tmp, "articulos.jsonl")
+    articulos = list(generar_articulos(80))
+    with open(fuente, "w", encoding="utf-8") as f:
+        # Con un duplicado, para que el descarte también tenga que coincidir
+        for art in articulos + articulos[:1]:
+            f.write(json.dumps({"titulo": art.titulo, "autor": art.autor, "texto": art.texto}) + "\n")
+    unico = os.path.join(tmp, "unico")
+    ParserHtml(cargar_articulos(fuente, errors=[]), unico).generate_html(deterministic=True, related=3)
+    for modo in distribuido.MODOS:
+        salida = os.path.join(tmp, modo)
+        parser = distribuido.construir_local(fuente, 3, salida, modo, deterministic=True, related=3)
+        assert len(parser.errors) == 1
+        archivos = sorted(os.path.relpath(os.path.join(raiz, a), salida)
+                          for raiz, _, nombres in os.walk(salida) for a in nombres)
+        esperados = sorted(os.path.relpath(os.path.join(raiz, a), unico)
+                           for raiz, _, nombres in os.walk(unico) for a in nombres)
+        assert archivos == esperados
+        for nombre in archivos:
+            with open(os.path.join(salida, nombre), "rb") as a, open(os.path.join(unico, nombre), "rb") as b:
+                assert a.read() == b.read(), nombre
+
+    # Cada nodo lee sólo los textos de sus artículos
+    incompleto = os.path.join(tmp, "incompleto")
+    for numero in range(2):
+        distribuido.firmar(fuente, numero, 2, incompleto)
+    distribuido.planificar(incompleto, 2)
+    parser = distribuido.ParserDistribuido(incompleto)
+    assert len(parser.errors) == 1
+    parser.generar_shard(fuente, 0, 2)
+    assert all(parser.store.textos[:40]) and not any(parser.store.textos[40:])
+
+    # Sin el resultado de todos los shards no se combina
+    try:
+        parser.combinar(2)
+        assert False, "falta el shard 1"
+    except distribuido.ShardFaltanteError as e:
+        assert "shard-1" in str(e)
+    shutil.rmtree(tmp)
+
+def test_minificar():
+    html = (b"<div>\n  <p>Hola   mundo</p>\n  <a>uno</a> <a>dos</a>\n</div>\n"
+            b"<pre>  a\n   b</pre>\n<SCRIPT>\n  var x  = 1;\n</script>\n<p>\tfin </p>")
+    esperado = (b"<div><p>Hola mundo</p><a>uno</a> <a>dos</a></div>"
+                b"<pre>  a\n   b</pre><SCRIPT>\n  var x  = 1;\n</script><p> fin </p>")
+    assert b"".join(minificar.filtrar([html])) == esperado
+    # El resultado no depende de dónde se corten los fragmentos
+    for corte in range(1, len(html)):
+        for otro in (corte + 1, corte + 7):
+            partes = [html[:corte], html[corte:otro], html[otro:]]
+            assert b"".join(minificar.filtrar(partes)) == esperado, (corte, otro)
+
+    tmp = "tmp_minify"
+    articulos = [Articulo(f"Articulo numero {i}", "Ana Paz", f"Texto   del articulo {i}") for i in range(5)]
+    ParserHtml(articulos, output_dir=tmp).generate_html(deterministic=True)
+    with open(os.path.join(tmp, "index.html"), "rb") as f:
+        normal = f.read()
+    parser = ParserHtml(articulos, output_dir=tmp)
+    escritos = parser.generate_html(deterministic=True, incremental=True, minify=True)
+    # Cambia la plantilla: se reescriben todas las páginas
+    assert "index.html" in escritos and f"{parser.slugs[0]}.html" in escritos
+    with open(os.path.join(tmp, "index.html"), "rb") as f:
+        minificado = f.read()
+    assert len(minificado) < len(normal)
+    assert b">\n" not in minificado and b"  " not in minificado
+    assert b"<script src='" + busqueda.SCRIPT_NAME.encode() in open(os.path.join(tmp, "buscar.html"), "rb").read()
+    shutil.rmtree(tmp)
+
 if __name__ == "__main__":
     test_articulo_snippet_and_slug()
     test_filter_and_normalize()
     test_filter_methods()
     test_generate_html_creates_files()
+    test_adjacent_articles_duplicate_titles()
+    test_adjacent_articles_scaling()
+    test_generate_html_incremental()
+    test_generate_html_parallel_matches_serial()
+    test_cargar_articulos_jsonl_y_csv()
+    test_keyword_index_queries()
+    test_initial_pages()
+    test_paginated_index()
+    test_render_page_streaming()
+    test_plantilla_fijar()
+    test_search_index_shards()
+    test_generate_html_compress()
+    test_generate_html_reproducible()
+    test_render_cache()
+    test_render_cache_lru_eviction()
+    test_columnar_store()
+    test_estadisticas()
+    test_related_articles()
+    test_duplicate_articles()
+    test_benchmarks_corpus_y_comparacion()
+    test_generate_html_informe()
+    test_crear_zip_incremental()
+    test_missing_asset_fails_build()
+    test_watch_en_memoria()
+    test_build_distribuido_igual_a_un_nodo()
+    test_minificar()
     print("¡Todos los tests pasaron!")
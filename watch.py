@@ -0,0 +1,239 @@
+import argparse
+import functools
+import mimetypes
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cargador import cargar_articulos
+from parser_html import ARTICLE_NAVBAR, RECURSOS, STATIC_DIR, ParserHtml, _hash, render_article_body, render_page
+import recursos
+import relacionados
+
+# Segundos entre cada revisión de los archivos vigilados
+INTERVALO = 0.2
+
+HOST = "127.0.0.1"
+PUERTO = 8000
+
+class _Pendiente:
+    """
+    Página todavía sin renderizar. Se renderiza una sola vez aunque la pidan
+    varios hilos del servidor a la vez: el generador de render_page sólo se
+    puede recorrer una vez.
+    """
+    __slots__ = ("_render", "_lock", "valor")
+
+    def __init__(self, render):
+        self._render = render
+        self._lock = threading.Lock()
+        self.valor = None
+
+    def __call__(self):
+        with self._lock:
+            if self._render is not None:
+                render, self._render = self._render, None
+                self.valor = render()
+        return self.valor
+
+class SitioEnMemoria(ParserHtml):
+    """
+    ParserHtml que deja el sitio en memoria en lugar de escribirlo en disco.
+    Las páginas se guardan sin renderizar y se renderizan (una vez) cuando
+    se piden. Con `anterior` (el SitioEnMemoria de la versión previa de los
+    artículos) se conservan las páginas ya renderizadas cuyas entradas no
+    cambiaron, igual que en un build incremental.
+    """
+    def __init__(self, articulos, anterior=None, errors=None, **kwargs):
+        # nombre -> bytes, o _Pendiente si todavía no se pidió
+        self.paginas = {}
+        # ruta publicada (static/...) -> archivo de origen
+        self.recursos = {}
+        self._anterior = ({}, None)
+        self._estado_relacionados = {}
+        if anterior is not None:
+            self.paginas = {n: p for n, p in dict(anterior.paginas).items() if isinstance(p, bytes)}
+            self._anterior = (anterior._manifest, anterior._layout_clave)
+            self._estado_relacionados = anterior._estado_relacionados
+        super().__init__(articulos, output_dir=None, errors=errors, **kwargs)
+
+    def pagina(self, nombre):
+        """Bytes del archivo `nombre` (ruta relativa al sitio) o None si no existe."""
+        pagina = self.paginas.get(nombre)
+        if isinstance(pagina, _Pendiente):
+            pagina = pagina()
+            if pagina is not None:
+                self.paginas[nombre] = pagina
+        elif pagina is None and nombre in self.recursos:
+            with open(self.recursos[nombre], "rb") as f:
+                pagina = f.read()
+        return pagina
+
+    def _write(self, nombre, contenido, medir=True):
+        if isinstance(contenido, bytes):
+            self.paginas[nombre] = contenido
+        else:
+            self.paginas[nombre] = _Pendiente(functools.partial(b''.join, contenido))
+
+    def _write_articles(self, pendientes, timestamp, workers):
+        for i in pendientes:
+            nombre = f"{self.slugs[i]}.html"
+            self.paginas[nombre] = _Pendiente(functools.partial(self._render_article, i, timestamp))
+            self._escritos.append(nombre)
+
+    def _render_article(self, i, timestamp):
+        datos = self._article_data(i)
+        return b''.join(render_page(datos[0], ARTICLE_NAVBAR, render_article_body(datos), timestamp, self._plantilla))
+
+    def _related_positions(self, k):
+        textos = self.store.textos
+        claves = [_hash(texto) for texto in textos]
+        posiciones, self._estado_relacionados = relacionados.calcular(
+            self.slugs, claves, textos, self._estado_relacionados, k)
+        return posiciones
+
+    def _copiar_recursos(self, origen):
+        mapa = recursos.mapa(origen, RECURSOS)
+        self.recursos = {ruta: os.path.join(origen, nombre) for nombre, ruta in mapa.items()}
+        return mapa, []
+
+    def _load_manifest(self):
+        paginas, layout = self._anterior
+        return paginas, layout == self._layout_clave
+
+    def _save_manifest(self, paginas):
+        pass
+
+    def _preparar_carpeta(self, carpeta=''):
+        pass
+
+    def _existe(self, nombre):
+        return isinstance(self.paginas.get(nombre), bytes)
+
+    def _borrar(self, nombre):
+        self.paginas.pop(nombre, None)
+
+    def _comprimir(self, compress, hilos):
+        pass
+
+class Servidor:
+    """
+    Servidor de desarrollo: arma el sitio en memoria a partir de `fuente`
+    (ver cargador.cargar_articulos), lo sirve por HTTP en host:puerto y lo
+    vuelve a armar cada vez que cambia la fuente o algún recurso. Sólo se
+    renderizan de nuevo las páginas afectadas por el cambio.
+    """
+    def __init__(self, fuente, host=HOST, puerto=PUERTO, static_dir=None, intervalo=INTERVALO):
+        self.fuente = fuente
+        self.static_dir = static_dir or STATIC_DIR
+        self.intervalo = intervalo
+        self.sitio = None
+        self._firmas = None
+        self._detener = threading.Event()
+        self.http = ThreadingHTTPServer((host, puerto), _manejador(self))
+        self.http.daemon_threads = True
+
+    @property
+    def url(self):
+        host, puerto = self.http.server_address[:2]
+        return f"http://{host}:{puerto}/"
+
+    def _vigilados(self):
+        return [self.fuente] + [os.path.join(self.static_dir, n) for n in RECURSOS]
+
+    def _leer_firmas(self):
+        """(mtime, tamaño) de cada archivo vigilado (None si no existe)."""
+        firmas = []
+        for path in self._vigilados():
+            try:
+                st = os.stat(path)
+                firmas.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                firmas.append(None)
+        return firmas
+
+    def revisar(self):
+        """Vuelve a armar el sitio si cambió algún archivo vigilado. Devuelve True si lo armó."""
+        firmas = self._leer_firmas()
+        if firmas == self._firmas:
+            return False
+        self._firmas = firmas
+        self.construir()
+        return True
+
+    def construir(self):
+        """Arma el sitio; si falla (por cualquier error) se sigue sirviendo la versión anterior."""
+        inicio = time.perf_counter()
+        errores = []
+        try:
+            sitio = SitioEnMemoria(cargar_articulos(self.fuente, errors=errores), self.sitio, errors=errores)
+            sitio.generate_html(incremental=True, static_dir=self.static_dir)
+        except Exception as e:
+            print(f"Error: {type(e).__name__}: {e}")
+            return
+        previas = self.sitio._manifest if self.sitio else {}
+        self.sitio = sitio
+        for error in errores:
+            print(f"Advertencia: {error}")
+        cambiadas = sum(1 for nombre, clave in sitio._manifest.items() if previas.get(nombre) != clave)
+        print(f"{len(sitio.store)} artículos, {cambiadas} páginas cambiaron "
+              f"({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+    def servir(self):
+        """Atiende pedidos en un hilo y revisa los archivos hasta detener()."""
+        self.revisar()
+        hilo = threading.Thread(target=self.http.serve_forever, daemon=True)
+        hilo.start()
+        print(f"Sirviendo {self.url} (Ctrl+C para terminar)")
+        try:
+            while not self._detener.wait(self.intervalo):
+                self.revisar()
+        finally:
+            self.http.shutdown()
+            self.http.server_close()
+
+    def detener(self):
+        self._detener.set()
+
+def _manejador(servidor):
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            nombre = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).lstrip("/") or "index.html"
+            sitio = servidor.sitio
+            contenido = sitio.pagina(nombre) if sitio else None
+            if contenido is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            tipo = mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+            if tipo.startswith("text/") or tipo in ("application/javascript", "application/json"):
+                tipo += "; charset=utf-8"
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(contenido)))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(contenido)
+
+        def log_message(self, formato, *args):
+            pass
+    return Manejador
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python watch.py",
+                                     description="Sirve el sitio desde memoria y lo actualiza al editar los artículos")
+    parser.add_argument("fuente", help="archivo .jsonl o .csv con los artículos")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--intervalo", type=float, default=INTERVALO)
+    args = parser.parse_args(argv)
+    servidor = Servidor(args.fuente, args.host, args.puerto, intervalo=args.intervalo)
+    try:
+        servidor.servir()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())